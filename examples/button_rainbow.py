@@ -1,9 +1,8 @@
 #!/usr/bin/env python3
 
-import colorsys
 import time
 
-from pixelpi import Strip, PixelPiButton
+from pixelpi import Strip, PixelPiButton, effects
 
 
 class MyButtons:
@@ -40,19 +39,11 @@ mybuttons = MyButtons([strip1, strip2, strip3, strip4])
 
 button = PixelPiButton(callingclass=mybuttons, shortpress="clear", longpress="dosomethingelse")
 
-spacing = 360.0 / 16.0
-hue = 0
-
 try:
     while True:
-        hue = int(time.time() * 100) % 360
-        for x in range(256):
-            offset = x * spacing
-            h = ((hue + offset) % 360) / 360.0
-            r, g, b = [int(c * 255) for c in colorsys.hsv_to_rgb(h, 1.0, 1.0)]
-
-            for strip in [strip1, strip2, strip3, strip4]:
-                strip.setLEDs(rgb=(r, g, b), led=x)
+        # The hue moves round the colour wheel once every 3.6 seconds
+        for strip in [strip1, strip2, strip3, strip4]:
+            effects.rainbow(strip, hue=time.time() / 3.6, spread=1.0 / 16)
 
         for strip in [strip1, strip2, strip3, strip4]:
             strip.showLEDs()
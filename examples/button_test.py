@@ -5,6 +5,6 @@ import gc
 def dosomething():
     print("Done something")
 
-button = PixelPiButton(shortpress=dosomething())
+button = PixelPiButton(shortpress=dosomething)
 
 pause()
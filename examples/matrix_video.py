@@ -0,0 +1,27 @@
+import sys
+
+from pixelpi import Strip, VideoPlayer
+
+# Play an animated GIF or PNG:
+#     python3 matrix_video.py animation.gif
+#
+# or raw video piped from ffmpeg:
+#     ffmpeg -i clip.mp4 -f rawvideo -pix_fmt rgb24 -s 8x32 - | python3 matrix_video.py
+
+strip = Strip(terminal=4, size=(8, 32), ledtype='WS2812', shape="zmatrix", brightness=30)
+
+if len(sys.argv) > 1:
+    player = VideoPlayer(strip, sys.argv[1])
+else:
+    player = VideoPlayer(strip, sys.stdin.buffer, rawsize=(8, 32), fps=25)
+
+try:
+    player.play(loops=None)
+    print(player.getStats)
+
+except KeyboardInterrupt:
+    player.stop()
+
+strip.clearLEDs()
+strip.showLEDs()
+del strip
@@ -4,5 +4,17 @@
    :synopsis: For controlling a PixelPi board.
 """
 
+from . import effects
+from .animation import AnimationPlayer, AnimationWriter
+from .backend import SimulatorBackend, WS281xBackend
 from .button import PixelPiButton
+from .colour import ColourCorrection
+from .compositor import Compositor, Layer
+from .network import NetworkReceiver
+from .scheduler import FrameScheduler
 from .strip import Strip
+from .stripgroup import StripCanvas, StripGroup
+from .text import Font, Marquee, Sprite
+from .transition import Transition, TransitionQueue
+from .video import VideoPlayer
+from .virtualcanvas import Panel, VirtualCanvas
@@ -0,0 +1,365 @@
+"""
+.. module:: pixelpi
+   :platform: Unix
+   :synopsis: Pre-rendered animations saved to a file and played back from it
+
+An animation file holds a fixed sequence of frames, so a long show can be drawn once (on any computer) and then
+played on the Pi without working out any colours::
+
+    with AnimationWriter("show.pxa", 32, 8, fps=30, shape="zmatrix") as writer:
+        for frame in range(900):
+            draw(strip, frame)
+            writer.addFrame(strip.getLEDs(export="SNAPSHOT"))
+
+    player = AnimationPlayer("show.pxa", strip)
+    player.play(loops=None)
+
+The file starts with a header giving the size, shape, frame rate and :data:`Strip.patternlayouts` layout of the
+frames. Each frame is then stored either whole (``raw``) or as the runs of LEDs that changed since the frame before
+(``delta``), whichever is smaller, and the file ends with an index of where each frame is.
+"""
+
+import mmap
+import struct
+
+import numpy as np
+
+from .scheduler import FrameScheduler
+from .strip import Strip
+
+# ------------------------------------------------------------------
+# The header: magic, version, width, height, frame rate, shape, layout,
+# frame count and where the frame index starts
+# ------------------------------------------------------------------
+_header = struct.Struct("<4sHxxIId16s16sIxxxxQ")
+_magic = b"PXPA"
+_version = 1
+
+# ------------------------------------------------------------------
+# Each entry of the frame index: where the frame starts, how many bytes
+# it has and whether it is raw or a delta
+# ------------------------------------------------------------------
+_indextype = np.dtype([("offset", "<u8"), ("size", "<u4"), ("kind", "<u4")])
+_raw = 0
+_delta = 1
+
+
+class AnimationWriter:
+    """
+    Writes frames to an animation file. Use it as a context manager, or call :class:`close()` when all of the frames
+    have been added.
+
+    :type path: str
+    :param path: The file to write.
+
+    :type width: int
+    :param width: The width of the frames (1 for an LED string).
+
+    :type height: int
+    :param height: The height of the frames (or the length of an LED string).
+
+    :type fps: float
+    :param fps: The frame rate the animation plays at.
+
+    :type shape: str
+    :param shape: The shape of the LEDs the animation was made for, one of :data:`Strip.allshapeslist`.
+
+    :type layout: str
+    :param layout: The values saved for each LED, one of :data:`Strip.patternlayouts`.
+
+    :type delta: bool
+    :param delta: Whether frames may be saved as the changes from the frame before.
+
+    :type keyframes: int or None
+    :param keyframes: Save every ``keyframes``-th frame whole, so playback can jump to it quickly, or None to only
+        save the first frame whole.
+
+    :type maxruns: int
+    :param maxruns: The most runs of changed LEDs a delta frame may have. Frames with more are saved whole, as they
+        are quicker to play that way.
+    """
+
+    def __init__(self, path, width, height, fps=30, shape="straight", layout="RGB_BRIGHTNESS", delta=True,
+                 keyframes=None, maxruns=256):
+        if width <= 0 or height <= 0:
+            raise ValueError('The width and height must be 1 or more.')
+        if fps <= 0:
+            raise ValueError('The frame rate must be more than 0.')
+        if shape not in Strip.allshapeslist:
+            raise ValueError('The shape must be one of {}.'.format(', '.join(Strip.allshapeslist)))
+        if keyframes is not None and keyframes <= 0:
+            raise ValueError('The keyframe interval must be 1 or more.')
+
+        _, self.__values = Strip.layoutColumns(layout, 5)
+
+        self.__width = width
+        self.__height = height
+        self.__fps = float(fps)
+        self.__shape = shape
+        self.__layout = layout.upper()
+        self.__delta = delta
+        self.__keyframes = keyframes
+        self.__maxruns = maxruns
+
+        self.__previous = None
+        self.__index = []
+
+        self.__file = open(path, "wb")
+        self.__file.write(self.__headerBytes(0, 0))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __headerBytes(self, frames, indexoffset):
+        """Returns the packed file header."""
+        return _header.pack(_magic, _version, self.__width, self.__height, self.__fps, self.__shape.encode(),
+                            self.__layout.encode(), frames, indexoffset)
+
+    @property
+    def getFrameCount(self):
+        """Returns how many frames have been added."""
+        return len(self.__index)
+
+    def addFrame(self, pattern):
+        """
+        Adds the next frame.
+
+        :type pattern: numpy.ndarray, list or bytes-like
+        :param pattern: The values of each LED in the writer's layout, from the start of a string or row by row for a
+            matrix, such as ``strip.getLEDs(export="SNAPSHOT", layout=...)``.
+        """
+        if isinstance(pattern, (bytes, bytearray, memoryview)):
+            frame = np.frombuffer(pattern, dtype=np.uint8)
+        else:
+            frame = np.asarray(pattern).astype(np.uint8, copy=False)
+
+        if frame.size != self.__width * self.__height * self.__values:
+            raise ValueError('Each frame must have {} values for each of the {} LEDs.'.format(
+                self.__values, self.__width * self.__height))
+        frame = frame.reshape(-1, self.__values)
+
+        kind, data = _raw, [frame]
+
+        keyframe = self.__keyframes is not None and len(self.__index) % self.__keyframes == 0
+        if self.__delta and self.__previous is not None and not keyframe:
+            changed = (frame != self.__previous).any(axis=1)
+
+            # ------------------------------------------------------------------
+            # The runs of changed LEDs are where the changed flags flip
+            # ------------------------------------------------------------------
+            edges = np.flatnonzero(np.diff(np.concatenate(([0], changed.view(np.int8), [0]))))
+            starts, ends = edges[0::2], edges[1::2]
+
+            runs = np.empty((len(starts), 2), dtype="<u4")
+            runs[:, 0] = starts
+            runs[:, 1] = ends - starts
+            deltasize = 4 + runs.nbytes + int(runs[:, 1].sum()) * self.__values
+
+            if len(runs) <= self.__maxruns and deltasize < frame.nbytes:
+                kind, data = _delta, [np.array([len(runs)], dtype="<u4"), runs, frame[changed]]
+
+        offset = self.__file.tell()
+        size = 0
+        for block in data:
+            self.__file.write(np.ascontiguousarray(block).tobytes())
+            size += block.nbytes
+
+        # Keep every frame 4-byte aligned, so the runs can be read in place
+        self.__file.write(bytes(-size % 4))
+
+        self.__index.append((offset, size, kind))
+        self.__previous = frame.copy()
+
+    def close(self):
+        """Writes the frame index and finishes the file."""
+        if self.__file is None:
+            return
+
+        indexoffset = self.__file.tell()
+        self.__file.write(np.array(self.__index, dtype=_indextype).tobytes())
+        self.__file.seek(0)
+        self.__file.write(self.__headerBytes(len(self.__index), indexoffset))
+        self.__file.close()
+        self.__file = None
+
+
+class AnimationPlayer:
+    """
+    Plays an animation file on a :class:`Strip` or :class:`StripGroup` of the same size.
+
+    The file is memory-mapped rather than read, so even a long show starts straight away, and each frame is copied
+    from the file straight into the LEDs without making any new arrays. Delta frames only write the LEDs that
+    changed, so :class:`Strip.showLEDs()` only re-encodes those. While the animation plays it owns the LEDs: anything
+    else drawn on them is kept only until a frame changes it.
+
+    :type path: str
+    :param path: The animation file.
+
+    :type strip: Strip or StripGroup
+    :param strip: The LEDs to play the animation on.
+    """
+
+    def __init__(self, path, strip):
+        with open(path, "rb") as f:
+            self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.__map) < _header.size:
+            raise ValueError('The file is not a PixelPi animation.')
+
+        magic, version, width, height, fps, shape, layout, frames, indexoffset = _header.unpack_from(self.__map)
+        if magic != _magic or version != _version:
+            raise ValueError('The file is not a PixelPi animation.')
+        if indexoffset == 0:
+            raise ValueError('The animation file was not finished.')
+
+        self.__width = width
+        self.__height = height
+        self.__fps = fps
+        self.__shape = shape.rstrip(b"\0").decode()
+        self.__layout = layout.rstrip(b"\0").decode()
+        self.__framecount = frames
+
+        # ------------------------------------------------------------------
+        # The whole file as bytes and the frame index, both read in place,
+        # and the frames that are saved whole
+        # ------------------------------------------------------------------
+        self.__data = np.frombuffer(self.__map, dtype=np.uint8)
+        self.__index = np.frombuffer(self.__map, dtype=_indextype, count=frames, offset=indexoffset)
+        self.__keyframes = np.flatnonzero(self.__index["kind"] == _raw)
+
+        if frames == 0 or self.__index["kind"][0] != _raw:
+            raise ValueError('The animation file has no frames.')
+
+        # ------------------------------------------------------------------
+        # The LEDs, as an (N, values) view, and where the animation's values
+        # go in it
+        # ------------------------------------------------------------------
+        if strip.getWidth != width or strip.getHeight != height:
+            raise ValueError('The animation is {} x {}, but the LEDs are {} x {}.'.format(
+                width, height, strip.getWidth, strip.getHeight))
+
+        self.__strip = strip
+        canvas = strip.getCanvas
+        self.__pixels = canvas.reshape(-1, canvas.shape[2])
+        self.__columns, self.__values = Strip.layoutColumns(self.__layout, canvas.shape[2])
+
+        self.__frame = -1
+
+    def __del__(self):
+        self.close()
+
+    @property
+    def getFrameCount(self):
+        """Returns how many frames the animation has."""
+        return self.__framecount
+
+    @property
+    def getFPS(self):
+        """Returns the frame rate the animation was made for."""
+        return self.__fps
+
+    @property
+    def getShape(self):
+        """Returns the shape of the LEDs the animation was made for."""
+        return self.__shape
+
+    @property
+    def getLayout(self):
+        """Returns the :data:`Strip.patternlayouts` layout of the frames."""
+        return self.__layout
+
+    @property
+    def getFrame(self):
+        """Returns the number of the frame on the LEDs, or -1 if none has been drawn yet."""
+        return self.__frame
+
+    def __applyFrame(self, frame):
+        """Copies one frame from the file into the LEDs, on top of the frame before it."""
+        offset, size, kind = self.__index[frame].tolist()
+
+        if kind == _raw:
+            values = self.__data[offset:offset + size].reshape(-1, self.__values)
+            self.__pixels[:, self.__columns] = values
+            return
+
+        runcount = int(self.__data[offset:offset + 4].view("<u4")[0])
+        runs = self.__data[offset + 4:offset + 4 + runcount * 8].view("<u4").reshape(runcount, 2).tolist()
+        values = self.__data[offset + 4 + runcount * 8:offset + size].reshape(-1, self.__values)
+
+        position = 0
+        for start, count in runs:
+            self.__pixels[start:start + count, self.__columns] = values[position:position + count]
+            position += count
+
+    def drawFrame(self, frame):
+        """
+        Draws a frame on the LEDs (without showing it). The frames in between are applied as needed, starting from
+        the nearest frame saved whole if going backwards or a long way forwards.
+
+        :type frame: int
+        :param frame: The frame number (0 to ``getFrameCount - 1``).
+        """
+        if not 0 <= frame < self.__framecount:
+            raise ValueError('The frame must be between 0 and {}.'.format(self.__framecount - 1))
+
+        if frame == self.__frame:
+            return
+
+        keyframe = int(self.__keyframes[np.searchsorted(self.__keyframes, frame, side="right") - 1])
+        start = self.__frame + 1 if keyframe <= self.__frame < frame else keyframe
+
+        for f in range(start, frame + 1):
+            self.__applyFrame(f)
+
+        self.__frame = frame
+
+    def showFrame(self, frame=None):
+        """
+        Draws a frame and shows the LEDs.
+
+        :type frame: int or None
+        :param frame: The frame number, or None for the frame after the last one drawn (going back to the start
+            after the end).
+        """
+        if frame is None:
+            frame = (self.__frame + 1) % self.__framecount
+
+        self.drawFrame(frame)
+        self.__strip.showLEDs()
+
+    def play(self, loops=1, fps=None):
+        """
+        Plays the animation at a steady frame rate, using a :class:`FrameScheduler`. Frames the Pi cannot keep up
+        with are skipped, so the animation stays in time.
+
+        :type loops: int or None
+        :param loops: How many times to play the animation, or None to play it until the scheduler is stopped.
+
+        :type fps: float or None
+        :param fps: The frame rate, or None for the one the animation was made for.
+
+        :return: The :class:`FrameScheduler` used, for its statistics
+        """
+        framecount = self.__framecount
+        if fps is None:
+            fps = self.__fps
+
+        def render(frame, t):
+            self.drawFrame(frame % framecount)
+
+        scheduler = FrameScheduler(render, self.__strip, fps=fps)
+        scheduler.run(duration=None if loops is None else loops * framecount / fps)
+
+        return scheduler
+
+    def close(self):
+        """Unmaps the animation file."""
+        if self.__dict__.get('_AnimationPlayer__map') is None:
+            return
+
+        self.__data = self.__index = None
+        self.__map.close()
+        self.__map = None
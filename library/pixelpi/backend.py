@@ -0,0 +1,281 @@
+"""
+.. module:: pixelpi
+   :platform: Unix
+   :synopsis: Output backends that send the LED colours of a Strip to the LEDs (or somewhere else)
+"""
+
+import collections
+import ctypes
+import threading
+import time
+
+import numpy as np
+
+try:
+    from gpiozero import OutputDevice
+    from rpi_ws281x import PixelStrip, ws
+except ImportError:
+    OutputDevice = PixelStrip = ws = None
+
+
+class WS281xBackend:
+    """
+    Sends the LED colours of a :class:`Strip` to WS281x LEDs attached to a PixelPi terminal, using the rpi_ws281x
+    library. This is the backend used unless another is given to the :class:`Strip`.
+
+    Every backend has the same methods as this one: :class:`begin()` is called once by the Strip, then
+    :class:`writeFrame()` and :class:`show()` each time the LEDs are shown.
+
+    Terminal 1 is sent by the kernel SPI driver, but terminals 2 and 4 share the PWM peripheral, and they and terminal
+    3 (PCM) are sent by DMA on the channel given in :data:`dmachannels`. Terminals using the same DMA channel are sent
+    one after another, even from the output threads of ``threaded`` Strips, so only terminal 1 is sent at the same
+    time as the others.
+    """
+
+    # ------------------------------------------------------------------
+    # The DMA channel used for each data pin, or None for the SPI pin,
+    # and a lock for each channel so only one terminal uses it at a time
+    # ------------------------------------------------------------------
+    dmachannels = {10: None, 12: 10, 13: 10, 21: 10}
+
+    __dmalocks = {}
+
+    def __init__(self):
+        if PixelStrip is None:
+            raise ImportError('The rpi_ws281x and gpiozero libraries are needed to drive LEDs. '
+                              'Use SimulatorBackend to run without them.')
+
+        self.__strip = None
+        self.__statuspin = None
+        self.__writeFrame = None
+        self.__lock = None
+        self.__wait = None
+
+    def begin(self, length, controlpin, channel, onoffpin, ledtype):
+        """
+        Sets up the LEDs.
+
+        :type length: int
+        :param length: The number of LEDs.
+
+        :type controlpin: int
+        :param controlpin: The GPIO pin the LED data is sent on.
+
+        :type channel: int
+        :param channel: The PWM channel used for the pin.
+
+        :type onoffpin: int
+        :param onoffpin: The GPIO pin which turns the terminal output on and off.
+
+        :type ledtype: str
+        :param ledtype: One of :data:`Strip.ledtypeslist`.
+        """
+        supportedstriptypes = {}
+        for t in ws.__dict__:
+            if '_STRIP' in t:
+                k = t.replace('_STRIP', '')
+                v = getattr(ws, t)
+                supportedstriptypes[k] = v
+
+        # -------------------------------------------------------------------
+        # Set up the rpi_ws281x callingclass. Brightness is applied per LED
+        # by the Strip, so the driver runs at full brightness
+        # -------------------------------------------------------------------
+        dma = self.dmachannels.get(controlpin, 10)
+        self.__strip = PixelStrip(length, controlpin, 800000, 10 if dma is None else dma, False, 255, channel,
+                                  supportedstriptypes[ledtype])
+        self.__strip.begin()
+        self.__writeFrame = self.__frameWriter()
+
+        # -------------------------------------------------------------------
+        # A terminal sent by DMA shares its channel's lock, and waits for its
+        # transfer to finish before letting the next terminal start
+        # -------------------------------------------------------------------
+        if dma is None:
+            self.__lock = threading.Lock()
+        else:
+            self.__lock = WS281xBackend.__dmalocks.setdefault(dma, threading.Lock())
+
+            leds = getattr(self.__strip, '_leds', None)
+            wait = getattr(ws, 'ws2811_wait', None)
+            if leds is not None and callable(wait):
+                self.__wait = lambda: wait(leds)
+
+        # -------------------------------------------------------------------
+        # Set up the pin which defines whether the terminal is written to or not
+        # -------------------------------------------------------------------
+        self.__statuspin = OutputDevice(onoffpin, active_high=False, initial_value=False)
+
+    def __frameWriter(self):
+        """
+        Finds the quickest way of writing a whole frame of colour words to the PixelStrip.
+
+        A PixelStrip with a ``setPixelBuffer(words)`` method (such as an in-process fake) is handed the frame
+        directly. Otherwise the frame is copied straight into the rpi_ws281x LED buffer, falling back to one
+        ``setPixelColor`` call per LED if that buffer cannot be found.
+
+        :return: A function taking the (N,) array of colour words and an array of the indexes of the words that have
+            changed
+        """
+        setpixelbuffer = getattr(self.__strip, 'setPixelBuffer', None)
+
+        try:
+            address = int(ws.ws2811_channel_t_leds_get(self.__strip._channel))
+        except (AttributeError, TypeError, ValueError):
+            address = 0
+
+        if callable(setpixelbuffer):
+            def writeframe(words, changed):
+                setpixelbuffer(words)
+        elif address:
+            def writeframe(words, changed):
+                ctypes.memmove(address, words.ctypes.data, words.nbytes)
+        else:
+            strip = self.__strip
+
+            def writeframe(words, changed):
+                for pixel, colour in zip(changed.tolist(), words[changed].tolist()):
+                    strip.setPixelColor(pixel, colour)
+
+        return writeframe
+
+    def writeFrame(self, words, changed):
+        """
+        Writes a frame to the LED buffer, ready to be shown.
+
+        :type words: numpy.ndarray
+        :param words: The (N,) array of 32-bit (white, red, green, blue) colour words, in wiring order.
+
+        :type changed: numpy.ndarray
+        :param changed: The indexes of the words that have changed since the last frame.
+        """
+        self.__writeFrame(words, changed)
+
+    def show(self):
+        """Sends the LED buffer to the LEDs, waiting for any other terminal using the same DMA channel."""
+        with self.__lock:
+            self.__strip.show()
+            if self.__wait is not None:
+                self.__wait()
+
+    @property
+    def status(self):
+        """Whether output to the LEDs is enabled."""
+        return self.__statuspin.value == 1
+
+    @status.setter
+    def status(self, status):
+        if status:
+            self.__statuspin.on()
+        else:
+            self.__statuspin.off()
+
+    def close(self):
+        """Disposes of the rpi_ws281x callingclass."""
+        self.__strip = None
+
+
+class SimulatorBackend:
+    """
+    An output backend that keeps the frames a :class:`Strip` sends in memory instead of driving LEDs, so the library
+    can be used, tested and benchmarked without a Raspberry Pi. For example::
+
+        sim = SimulatorBackend()
+        strip = Strip(1, 256, backend=sim)
+        strip.setLEDs(rgb=(255, 0, 0))
+        strip.showLEDs()
+        print(sim.getFrames[-1], sim.getWireTime)
+
+    The time the frames would take on the wire is modelled as :data:`ledtime` per LED (24 bits at 800 kHz) plus
+    :data:`resettime` per frame. With ``realtime=True``, :class:`show()` waits for the previous frame to finish
+    as the rpi_ws281x driver does.
+
+    :type record: bool
+    :param record: Whether to keep a copy of each frame shown.
+
+    :type maxframes: int or None
+    :param maxframes: The most frames to keep (the oldest are dropped), or None to keep them all.
+
+    :type realtime: bool
+    :param realtime: Whether :class:`show()` waits for the modelled wire time.
+    """
+
+    ledtime = 30e-6
+    resettime = 50e-6
+
+    def __init__(self, record=True, maxframes=None, realtime=False):
+        self.__record = record
+        self.__frames = collections.deque(maxlen=maxframes)
+        self.__realtime = realtime
+        self.__words = None
+        self.__ledtype = None
+        self.__status = False
+        self.__shows = 0
+        self.__wiretime = 0.0
+        self.__busyuntil = 0.0
+
+    def begin(self, length, controlpin, channel, onoffpin, ledtype):
+        """Sets up the simulated LEDs. See :class:`WS281xBackend.begin()`."""
+        self.__words = np.zeros(length, dtype=np.uint32)
+        self.__ledtype = ledtype
+
+    def writeFrame(self, words, changed):
+        """Writes a frame to the simulated LED buffer. See :class:`WS281xBackend.writeFrame()`."""
+        self.__words[changed] = words[changed]
+
+    def show(self):
+        """'Sends' the simulated LED buffer, recording the frame and the time it would take on the wire."""
+        frametime = len(self.__words) * self.ledtime + self.resettime
+
+        if self.__realtime:
+            now = time.monotonic()
+            if now < self.__busyuntil:
+                time.sleep(self.__busyuntil - now)
+                now = self.__busyuntil
+            self.__busyuntil = now + frametime
+
+        if self.__record:
+            self.__frames.append(self.__words.copy())
+
+        self.__shows += 1
+        self.__wiretime += frametime
+
+    @property
+    def status(self):
+        """Whether output to the simulated LEDs is enabled."""
+        return self.__status
+
+    @status.setter
+    def status(self, status):
+        self.__status = bool(status)
+
+    def close(self):
+        """Nothing to dispose of."""
+        pass
+
+    @property
+    def getLEDType(self):
+        """Returns the LED type the Strip was set up with."""
+        return self.__ledtype
+
+    @property
+    def getFrames(self):
+        """Returns the recorded frames, oldest first, as (N,) arrays of colour words in wiring order."""
+        return list(self.__frames)
+
+    @property
+    def getColours(self):
+        """Returns the LED buffer as an (N, 4) array of (red, green, blue, white) values in wiring order."""
+        wordbytes = self.__words.astype('<u4').view(np.uint8).reshape(-1, 4)
+
+        return wordbytes[:, [2, 1, 0, 3]]
+
+    @property
+    def getShows(self):
+        """Returns how many frames have been shown."""
+        return self.__shows
+
+    @property
+    def getWireTime(self):
+        """Returns the total seconds the frames shown would have taken to send to the LEDs."""
+        return self.__wiretime
@@ -0,0 +1,163 @@
+"""
+.. module:: pixelpi
+   :platform: Unix
+   :synopsis: Benchmarks of the Strip hot paths, run without LEDs using the SimulatorBackend
+
+Run the benchmarks with::
+
+    python3 -m pixelpi.benchmark
+
+Save the results with ``--json results.json`` and compare a later run against them with
+``--baseline results.json``, which fails if any benchmark has become more than ``--tolerance`` times slower.
+"""
+
+import argparse
+import itertools
+import json
+import sys
+import timeit
+
+import numpy as np
+from PIL import Image
+
+from .backend import SimulatorBackend
+from .strip import Strip
+
+stringsizes = [8, 64, 256, 1024, 4096]
+matrixsizes = [(8, 1), (8, 8), (16, 16), (32, 32), (64, 64)]
+
+
+def _fill(strip, count):
+    strip.setLEDs(rgb=(next(count) & 0xff, 0, 0))
+
+
+def _setOne(strip, count):
+    strip.setLEDs(led=next(count) % strip.getLength, rgb=(255, 0, 0))
+
+
+def _shift(strip, count):
+    strip.shift("RIGHT" if strip.getWidth > 1 else "UP", 1)
+
+
+def _mirror(strip, count):
+    strip.mirror("HORIZONTAL" if strip.getWidth > 1 else "VERTICAL")
+
+
+_images = {}
+
+
+def _image(strip, count):
+    size = (strip.getWidth, strip.getHeight)
+    if size not in _images:
+        colours = np.random.default_rng(0).integers(0, 256, (strip.getHeight, strip.getWidth, 3), dtype=np.uint8)
+        _images[size] = Image.fromarray(colours, 'RGB')
+    strip.setLEDs(image=_images[size])
+
+
+def _showFull(strip, count):
+    _fill(strip, count)
+    strip.showLEDs()
+
+
+def _showUnchanged(strip, count):
+    strip.showLEDs()
+
+
+operations = {
+    "setLEDs fill": _fill,
+    "setLEDs led": _setOne,
+    "shift": _shift,
+    "mirror": _mirror,
+    "setLEDs image": _image,
+    "fill + showLEDs": _showFull,
+    "showLEDs unchanged": _showUnchanged,
+}
+
+
+def _strips():
+    """Yields a simulated Strip of each benchmark size."""
+    for size in stringsizes:
+        yield Strip(1, size, backend=SimulatorBackend(record=False))
+    for size in matrixsizes:
+        yield Strip(1, size, shape='zmatrix', backend=SimulatorBackend(record=False))
+
+
+def run(repeat=3):
+    """
+    Times each operation on each size of string and matrix.
+
+    :type repeat: int
+    :param repeat: How many times to repeat each timing (the fastest is kept).
+    :return: A list of dictionaries of ``operation``, ``shape``, ``leds`` and ``seconds`` (per call)
+    """
+    results = []
+
+    for strip in _strips():
+        shape = "string" if strip.getWidth == 1 else "{}x{}".format(strip.getWidth, strip.getHeight)
+
+        for name, operation in operations.items():
+            count = itertools.count()
+            timer = timeit.Timer(lambda: operation(strip, count))
+            number, _ = timer.autorange()
+            seconds = min(timer.repeat(repeat=repeat, number=number)) / number
+
+            results.append({"operation": name, "shape": shape, "leds": strip.getLength, "seconds": seconds})
+
+    return results
+
+
+def compare(results, baseline, tolerance=1.5):
+    """
+    Compares benchmark results with an earlier run.
+
+    :return: A list of the results more than ``tolerance`` times slower than the baseline, each with the baseline
+        ``seconds`` added as ``baseline``
+    """
+    before = {(r["operation"], r["shape"], r["leds"]): r["seconds"] for r in baseline}
+    regressions = []
+
+    for result in results:
+        seconds = before.get((result["operation"], result["shape"], result["leds"]))
+        if seconds is not None and result["seconds"] > seconds * tolerance:
+            regressions.append(dict(result, baseline=seconds))
+
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Benchmark the PixelPi Strip hot paths.")
+    parser.add_argument("--json", help="save the results to this file")
+    parser.add_argument("--baseline", help="compare the results with those saved in this file")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="how many times slower than the baseline counts as a regression (default 1.5)")
+    parser.add_argument("--repeat", type=int, default=3, help="timing repeats (default 3)")
+    args = parser.parse_args(args)
+
+    results = run(repeat=args.repeat)
+
+    print("{:<20} {:>8} {:>6} {:>12}".format("operation", "shape", "leds", "us per call"))
+    for result in results:
+        print("{:<20} {:>8} {:>6} {:>12.2f}".format(result["operation"], result["shape"], result["leds"],
+                                                   result["seconds"] * 1e6))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=1)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+
+        for result in regressions:
+            print("REGRESSION: {} on {} ({} LEDs): {:.2f} us, was {:.2f} us".format(
+                result["operation"], result["shape"], result["leds"], result["seconds"] * 1e6,
+                result["baseline"] * 1e6))
+
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
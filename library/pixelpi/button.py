@@ -1,7 +1,13 @@
+import queue
+import threading
 import time
+import traceback
 from subprocess import check_call
 
-from gpiozero import Button
+try:
+    from gpiozero import Button
+except ImportError:
+    Button = None
 
 
 class PixelPiButton:
@@ -48,51 +54,130 @@ class PixelPiButton:
     When the button is held for shortpresstime, the 'clear' method will be executed, unless it is held for
     longpresstime after which 'whitelights' will be called.
 
+    Releasing the button before the short press time does nothing, unless a ``doublepress`` is given: two such
+    quick presses within ``doublepresstime`` seconds call it. Further hold times can be given in ``presses``, and
+    ``holdrepeat`` is called every ``repeattime`` seconds for as long as the button is held, for example to step
+    through settings.
+
+    The button is handled on the edges of the button signal, so nothing runs while the button is simply held down.
+    The methods are called one after another on a worker thread, so a slow method never delays the next button
+    event. :class:`getStats` gives how long it took from the button event to each method being called.
+
     :type callingclass: object
     :param callingclass: The 'local' class.
 
     :type shortpresstime: float
     :param shortpresstime: The short press time.
 
-    :type shortpress: str
-    :param shortpress: The method in class ``callingclass`` that is called after the button has been pressed for
-        shortpresstime seconds.
+    :type shortpress: str or function
+    :param shortpress: The method in class ``callingclass`` (or a function) that is called after the button has been
+        pressed for shortpresstime seconds.
 
     :type longpresstime: float
     :param longpresstime: The long press time.
 
-    :type longpress: str
-    :param longpress: The method in class ``callingclass`` that is called after the button has been pressed for
-        longpresstime seconds.
+    :type longpress: str or function
+    :param longpress: The method in class ``callingclass`` (or a function) that is called after the button has been
+        pressed for longpresstime seconds.
+
+    :type presses: list or None
+    :param presses: More (press time, method) pairs. The method with the longest press time that the button was held
+        for is called.
+
+    :type doublepress: str, function or None
+    :param doublepress: The method called when the button is pressed quickly twice.
+
+    :type doublepresstime: float
+    :param doublepresstime: The most seconds between the two presses of a double press.
+
+    :type holdrepeat: str, function or None
+    :param holdrepeat: The method called repeatedly while the button is held.
+
+    :type repeattime: float
+    :param repeattime: The seconds between calls of ``holdrepeat``.
+
+    :type button: gpiozero.Button or None
+    :param button: The button to use, or None for the PixelPi button on GPIO 26.
     """
 
-    def __init__(self, callingclass=None, shortpresstime=0.5, shortpress=None, longpresstime=2.0, longpress=None):
+    statslist = ["presses", "actions", "doublepresses", "repeats", "latencylast", "latencymax", "latencytotal"]
+
+    def __init__(self, callingclass=None, shortpresstime=0.5, shortpress=None, longpresstime=2.0, longpress=None,
+                 presses=None, doublepress=None, doublepresstime=0.4, holdrepeat=None, repeattime=0.5, button=None):
+        if button is None and Button is None:
+            raise ImportError('The gpiozero library is needed to use the PixelPi button.')
+
         self.__buttonpin = 26
 
         if shortpresstime >= longpresstime:
-            raise ValueError('The short press time must be longer than the long press time.')
+            raise ValueError('The short press time must be shorter than the long press time.')
         elif shortpresstime <= 0 or longpresstime <= 0:
-            raise ValueError('The short and long press times must more than 0.0 seconds.')
+            raise ValueError('The short and long press times must be more than 0.0 seconds.')
+        if doublepresstime <= 0 or repeattime <= 0:
+            raise ValueError('The double press and repeat times must be more than 0.0 seconds.')
 
         self.__shortpresstime = shortpresstime
         self.__longpresstime = longpresstime
-        self.__thebutton = Button(self.__buttonpin)
+        self.__doublepresstime = doublepresstime
 
         try:
             if shortpress is None:
-                self.__shortpress = getattr(self, "__reboot")
-            else:
-                self.__shortpress = getattr(callingclass, shortpress)
-
+                shortpress = self.__reboot
             if longpress is None:
-                self.__longpress = getattr(self, "__shutdown")
-            else:
-                self.__longpress = getattr(callingclass, longpress)
-        except:
+                longpress = self.__shutdown
+
+            # ------------------------------------------------------------------
+            # The methods to call for each press time, from the shortest
+            # ------------------------------------------------------------------
+            thresholds = [(shortpresstime, shortpress), (longpresstime, longpress)] + list(presses or [])
+            self.__thresholds = sorted(((float(t), self.__method(callingclass, m)) for t, m in thresholds),
+                                       key=lambda threshold: threshold[0])
+
+            self.__doublepress = self.__method(callingclass, doublepress)
+            self.__holdrepeat = self.__method(callingclass, holdrepeat)
+        except (AttributeError, TypeError, ValueError):
             raise AttributeError('PixelPiButton: There is a problem with the class methods. '
                                  'Check that the callingclass and methods are correct.')
 
-        self.__thebutton.when_pressed = self.__pushbutton
+        if self.__thresholds[0][0] <= 0:
+            raise ValueError('The press times must be more than 0.0 seconds.')
+
+        # ------------------------------------------------------------------
+        # When the button was last pressed and last quickly pressed and
+        # released (monotonic seconds). The stats are updated by both the
+        # button's callback thread and the worker thread, so under a lock
+        # ------------------------------------------------------------------
+        self.__presstime = None
+        self.__clicktime = None
+        self.__stats = dict.fromkeys(self.statslist, 0)
+        self.__statslock = threading.Lock()
+
+        # ------------------------------------------------------------------
+        # The worker thread that calls the methods
+        # ------------------------------------------------------------------
+        self.__queue = queue.Queue()
+        self.__worker = threading.Thread(target=self.__work, daemon=True)
+        self.__worker.start()
+
+        if button is None:
+            button = Button(self.__buttonpin)
+        self.__thebutton = button
+
+        if self.__holdrepeat is not None:
+            self.__thebutton.hold_time = repeattime
+            self.__thebutton.hold_repeat = True
+            self.__thebutton.when_held = self.__held
+
+        self.__thebutton.when_pressed = self.__pressed
+        self.__thebutton.when_released = self.__released
+
+    @staticmethod
+    def __method(callingclass, method):
+        """Returns the function to call for a method name (or function), or None if there is none."""
+        if method is None or callable(method):
+            return method
+
+        return getattr(callingclass, method)
 
     @staticmethod
     def __shutdown():
@@ -102,16 +187,91 @@ class PixelPiButton:
     def __reboot():
         check_call(['sudo', 'reboot'])
 
-    def __pushbutton(self):
-        start_time = time.time()
-        now_time = time.time()
+    @property
+    def getStats(self):
+        """
+        Returns a dictionary of what the button has done:
+
+            * ``presses`` - times the button was pressed
+            * ``actions`` - press time methods called
+            * ``doublepresses`` - double press methods called
+            * ``repeats`` - hold repeat methods called
+            * ``latencylast`` - seconds from the button event to the last method being called
+            * ``latencymax`` - the longest latency seen
+            * ``latencytotal`` - the total latency of all methods called
+        """
+        with self.__statslock:
+            return dict(self.__stats)
+
+    def resetStats(self):
+        """Sets all of the :class:`getStats` counters back to 0."""
+        with self.__statslock:
+            self.__stats = dict.fromkeys(self.statslist, 0)
+
+    def __dispatch(self, method, eventtime, counter):
+        """Queues a method to be called by the worker thread."""
+        self.__queue.put((method, eventtime, counter))
+
+    def __pressed(self):
+        """The button has been pressed."""
+        self.__presstime = time.monotonic()
+        with self.__statslock:
+            self.__stats["presses"] += 1
+
+    def __held(self):
+        """The button has been held for another repeat time."""
+        self.__dispatch(self.__holdrepeat, time.monotonic(), "repeats")
 
-        while self.__thebutton.is_active:
-            now_time = time.time()
+    def __released(self):
+        """The button has been released: call the method for how long it was held, or count a quick press."""
+        now = time.monotonic()
+        if self.__presstime is None:
+            return
+
+        held = now - self.__presstime
+        self.__presstime = None
+
+        method = None
+        for presstime, pressmethod in self.__thresholds:
+            if held >= presstime:
+                method = pressmethod
+
+        if method is not None:
+            self.__clicktime = None
+            self.__dispatch(method, now, "actions")
+        elif self.__doublepress is not None:
+            if self.__clicktime is not None and now - self.__clicktime <= self.__doublepresstime:
+                self.__clicktime = None
+                self.__dispatch(self.__doublepress, now, "doublepresses")
+            else:
+                self.__clicktime = now
+
+    def __work(self):
+        """The worker thread: calls each queued method in turn."""
+        while True:
+            item = self.__queue.get()
+            if item is None:
+                return
+
+            method, eventtime, counter = item
+            latency = time.monotonic() - eventtime
+
+            with self.__statslock:
+                self.__stats[counter] += 1
+                self.__stats["latencylast"] = latency
+                self.__stats["latencymax"] = max(self.__stats["latencymax"], latency)
+                self.__stats["latencytotal"] += latency
+
+            try:
+                method()
+            except Exception:
+                traceback.print_exc()
 
-        diff = now_time - start_time
+    def close(self):
+        """Stops handling the button and waits for any methods still queued to finish."""
+        self.__thebutton.when_pressed = None
+        self.__thebutton.when_released = None
+        self.__thebutton.when_held = None
 
-        if diff >= 2.0:
-            self.__longpress()
-        elif diff >= 0.5:
-            self.__shortpress()
+        self.__queue.put(None)
+        self.__worker.join()
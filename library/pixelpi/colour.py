@@ -0,0 +1,128 @@
+"""
+.. module:: pixelpi
+   :platform: Unix
+   :synopsis: Colour correction applied to the LEDs as they are shown
+"""
+
+import numpy as np
+
+
+def rgbToRGBW(rgb):
+    """
+    Moves the white shared by the red, green and blue of each colour onto a white LED, for whole arrays at once. The
+    white is the smallest of the three, so ``(255, 128, 0)`` stays as it is and ``(255, 255, 200)`` becomes
+    ``(55, 55, 0, 200)``.
+
+    :type rgb: numpy.ndarray or tuple
+    :param rgb: The colours, with a last axis of (red, green, blue).
+
+    :return: A uint8 array with a last axis of (red, green, blue, white)
+    """
+    rgb = np.asarray(rgb, dtype=np.uint8)
+    white = rgb.min(axis=-1, keepdims=True)
+
+    return np.concatenate([rgb - white, white], axis=-1)
+
+
+class ColourCorrection:
+    """
+    Describes how the colours of a :class:`Strip` are corrected as they are sent to the LEDs. The correction is
+    worked out once as a 256-entry table for each of red, green and blue, and applied to every LED in one step when
+    :class:`Strip.showLEDs()` is called, however the LEDs were drawn. For example::
+
+        correction = ColourCorrection(gamma=2.2, correction="TypicalLEDStrip", temperature="Tungsten100W", limit=0.8)
+        strip = Strip(1, 256, correction=correction)
+
+    :type gamma: float or None
+    :param gamma: The gamma (e.g. ``2.2``), or None for no gamma correction.
+
+    :type correction: tuple or str
+    :param correction: The (red, green, blue) scale (0-255 each) that makes the LEDs show white as white, or one of
+        :data:`correctionpresets`.
+
+    :type temperature: tuple or str
+    :param temperature: The (red, green, blue) scale (0-255 each) giving the colour temperature of white, or one of
+        :data:`temperaturepresets`.
+
+    :type limit: float
+    :param limit: The most any colour is allowed to be, from 0.0 to 1.0, to limit the power drawn.
+    """
+
+    correctionpresets = {
+        "Uncorrected": (255, 255, 255),
+        "TypicalLEDStrip": (255, 176, 240),
+        "TypicalPixelString": (255, 224, 140),
+    }
+
+    temperaturepresets = {
+        "Uncorrected": (255, 255, 255),
+        "Candle": (255, 147, 41),
+        "Tungsten40W": (255, 197, 143),
+        "Tungsten100W": (255, 214, 170),
+        "Halogen": (255, 241, 224),
+        "CarbonArc": (255, 250, 244),
+        "HighNoonSun": (255, 255, 251),
+        "DirectSunlight": (255, 255, 255),
+        "OvercastSky": (201, 226, 255),
+        "ClearBlueSky": (64, 156, 255),
+    }
+
+    def __init__(self, gamma=None, correction="Uncorrected", temperature="Uncorrected", limit=1.0):
+        if gamma is not None and gamma <= 0:
+            raise ValueError('The gamma must be more than 0.')
+        if not 0.0 <= limit <= 1.0:
+            raise ValueError('The limit must be between 0.0 and 1.0.')
+
+        self.__gamma = gamma
+        self.__correction = self.__checkScale(correction, self.correctionpresets, 'correction')
+        self.__temperature = self.__checkScale(temperature, self.temperaturepresets, 'temperature')
+        self.__limit = float(limit)
+
+    @staticmethod
+    def __checkScale(scale, presets, name):
+        """Checks a (red, green, blue) scale, looking up the name of a preset."""
+        if type(scale) is str:
+            if scale not in presets:
+                raise ValueError('The {} must be one of {}.'.format(name, ', '.join(presets)))
+            scale = presets[scale]
+
+        if type(scale) is not tuple or len(scale) != 3:
+            raise ValueError('The {} must be a tuple of the form (r, g, b).'.format(name))
+
+        return tuple(int(c) & 0xff for c in scale)
+
+    @property
+    def key(self):
+        """Returns a tuple that is the same for any two corrections that have the same effect."""
+        return self.__gamma, self.__correction, self.__temperature, self.__limit
+
+    @property
+    def curves(self):
+        """
+        Returns the correction as a (3, 256) float array of the red, green and blue output (0.0-255.0) for each
+        input value.
+        """
+        values = np.arange(256) / 255.0
+        if self.__gamma is not None:
+            values = values ** self.__gamma
+
+        scale = np.array(self.__correction) * np.array(self.__temperature) / (255.0 * 255.0) * self.__limit
+
+        return scale.reshape(3, 1) * values.reshape(1, 256) * 255.0
+
+    @property
+    def whiteCurve(self):
+        """
+        Returns the correction of the white LED of an RGBW LED as a (256,) float array of the output (0.0-255.0) for
+        each input value. Only the gamma and the limit apply, as the white LED has its own colour.
+        """
+        values = np.arange(256) / 255.0
+        if self.__gamma is not None:
+            values = values ** self.__gamma
+
+        return values * self.__limit * 255.0
+
+    @property
+    def tables(self):
+        """Returns the correction as a (3, 256) uint8 lookup table of the red, green and blue output values."""
+        return np.rint(self.curves).astype(np.uint8)
@@ -0,0 +1,418 @@
+"""
+.. module:: pixelpi
+   :platform: Unix
+   :synopsis: Layers of LEDs blended together onto a Strip or StripGroup
+
+A :class:`Compositor` keeps a stack of named :class:`Layer` objects, each with its own colours, position, opacity
+and blend mode, and blends them onto the LEDs when they are shown. For example, a status bar over a background
+animation::
+
+    compositor = Compositor(strip)
+    background = compositor.addLayer("background")
+    status = compositor.addLayer("status", size=(32, 3), offset=(0, 5), opacity=0.8)
+
+    status.clearLEDs()
+    status.setLEDs(rgb=(0, 0, 255), alpha=255)
+
+    while True:
+        effects.rainbow(background, hue)
+        compositor.showLEDs()
+
+Layers are blended bottom (the first added) to top. The blend of the layers below each layer is kept, so when only
+the top layers change, only they are blended again.
+"""
+
+import numpy as np
+
+blendlist = ["NORMAL", "ADD", "MULTIPLY", "MAX"]
+
+
+class Layer:
+    """
+    One layer of a :class:`Compositor`. Layers are made with :class:`Compositor.addLayer()`.
+
+    A layer has a (height, width, 4) canvas of (red, green, blue, alpha), where alpha runs from 0 (transparent) to
+    255 (opaque). New layers are black and opaque. The effects in :mod:`pixelpi.effects` can draw on a layer as they
+    do on a Strip.
+
+    Drawing through the layer's methods, or getting its canvas, marks it as changed so it is blended again next time
+    the compositor is shown. Call :class:`markChanged()` after changing a canvas that was got earlier.
+    """
+
+    def __init__(self, name, size, offset=(0, 0), opacity=1.0, blend="NORMAL"):
+        width, height = size
+        if width <= 0 or height <= 0:
+            raise ValueError('The layer width and height must be 1 or more.')
+
+        self.__name = name
+        self.__width = width
+        self.__height = height
+        self.__canvas = np.zeros((height, width, 4), dtype=np.uint8)
+        self.__canvas[:, :, 3] = 255
+        self.__version = 0
+
+        self.offset = offset
+        self.opacity = opacity
+        self.blend = blend
+
+    @property
+    def getName(self):
+        """Returns the name of the layer."""
+        return self.__name
+
+    @property
+    def getWidth(self):
+        """Returns the width of the layer."""
+        return self.__width
+
+    @property
+    def getHeight(self):
+        """Returns the height of the layer."""
+        return self.__height
+
+    @property
+    def getCanvas(self):
+        """
+        Returns the layer as a (height, width, 4) numpy array of (red, green, blue, alpha) indexed by ``[y, x]``,
+        and marks the layer as changed.
+        """
+        self.markChanged()
+        return self.__canvas
+
+    @property
+    def getColours(self):
+        """Returns the layer's canvas for reading, without marking the layer as changed."""
+        return self.__canvas
+
+    @property
+    def getVersion(self):
+        """Returns a number that goes up each time the layer changes."""
+        return self.__version
+
+    @property
+    def offset(self):
+        """
+        Returns or sets the (x, y) position of the top left of the layer on the LEDs. Parts of the layer that are
+        off the LEDs are not shown.
+
+        :getter: Returns the offset.
+        :setter: Sets the offset.
+        :type: tuple
+        """
+        return self.__offset
+
+    @offset.setter
+    def offset(self, offset):
+        """
+        The setter for offset property.
+        """
+        if type(offset) is not tuple or len(offset) != 2:
+            raise ValueError('The offset must be a tuple of the form (x, y).')
+
+        self.__offset = (int(offset[0]), int(offset[1]))
+        self.markChanged()
+
+    @property
+    def opacity(self):
+        """
+        Returns or sets how opaque the whole layer is, from 0.0 (not shown) to 1.0 (as opaque as its alpha).
+
+        :getter: Returns the opacity.
+        :setter: Sets the opacity.
+        :type: float
+        """
+        return self.__opacity
+
+    @opacity.setter
+    def opacity(self, opacity):
+        """
+        The setter for opacity property.
+        """
+        if not 0.0 <= opacity <= 1.0:
+            raise ValueError('The opacity must be between 0.0 and 1.0.')
+
+        self.__opacity = float(opacity)
+        self.markChanged()
+
+    @property
+    def blend(self):
+        """
+        Returns or sets how the layer is blended with the layers below it:
+
+            * ``NORMAL`` - the layer covers the layers below
+            * ``ADD`` - the colours are added together
+            * ``MULTIPLY`` - the colours are multiplied, so the layer darkens those below
+            * ``MAX`` - the brighter of each colour is kept
+
+        :getter: Returns the blend mode.
+        :setter: Sets the blend mode.
+        :type: str
+        """
+        return self.__blend
+
+    @blend.setter
+    def blend(self, blend):
+        """
+        The setter for blend property.
+        """
+        blend = blend.upper()
+        if blend not in blendlist:
+            raise ValueError('The blend mode must be one of {}.'.format(', '.join(blendlist)))
+
+        self.__blend = blend
+        self.markChanged()
+
+    def markChanged(self):
+        """Marks the layer as changed, so it is blended again the next time the compositor is shown."""
+        self.__version += 1
+
+    def setLEDs(self, led=None, rgb=None, alpha=None):
+        """
+        Sets the colour, and optionally alpha, of one LED or all LEDs of the layer.
+
+        :type led: tuple or None
+        :param led: The (x, y) location on the layer, or None to set all LEDs.
+
+        :type rgb: tuple or None
+        :param rgb: The (red, green, blue) colour, or None to only set the alpha.
+
+        :type alpha: int or None
+        :param alpha: The alpha (0-255), or None to keep the current alpha.
+        """
+        if led is None:
+            target = self.__canvas
+        else:
+            if type(led) is not tuple or len(led) != 2:
+                raise ValueError('The led location of a layer must be a tuple of the form (x, y).')
+            x, y = led
+            if not (0 <= x < self.__width and 0 <= y < self.__height):
+                raise ValueError('The led location is outside the layer.')
+            target = self.__canvas[y, x]
+
+        if rgb is not None:
+            if type(rgb) is not tuple or len(rgb) != 3:
+                raise ValueError('The rgb value must be a tuple of the form (r, g, b).')
+            target[..., 0:3] = [int(c) & 0xff for c in rgb]
+
+        if alpha is not None:
+            if not 0 <= alpha <= 255:
+                raise ValueError('The alpha must be between 0 and 255.')
+            target[..., 3] = alpha
+
+        self.markChanged()
+
+    def setImage(self, image, position=(0, 0)):
+        """
+        Copies an RGB or RGBA image onto the layer, clipping any part that does not fit. An RGB image is opaque.
+
+        :type image: RGB or RGBA Format image
+        :param image: An image in RGB or RGBA format (see PILLOW library)
+
+        :type position: tuple
+        :param position: The (x, y) location on the layer of the top left of the image.
+        """
+        if image.mode not in ('RGB', 'RGBA'):
+            raise ValueError("The image must be in RGB or RGBA format.")
+
+        colours = np.asarray(image)
+        px, py = position
+        left, top = max(px, 0), max(py, 0)
+        right = min(px + colours.shape[1], self.__width)
+        bottom = min(py + colours.shape[0], self.__height)
+
+        if left < right and top < bottom:
+            source = colours[top - py:bottom - py, left - px:right - px]
+            target = self.__canvas[top:bottom, left:right]
+            target[:, :, 0:source.shape[2]] = source
+            if image.mode == 'RGB':
+                target[:, :, 3] = 255
+
+        self.markChanged()
+
+    def clearLEDs(self):
+        """Makes the whole layer transparent black."""
+        self.__canvas[:] = 0
+        self.markChanged()
+
+
+class Compositor:
+    """
+    Blends a stack of :class:`Layer` objects onto the LEDs of a :class:`Strip` or :class:`StripGroup`.
+
+    Only the colours of the LEDs are set; their brightness is left as it is.
+
+    :type strip: Strip or StripGroup
+    :param strip: The LEDs to blend the layers onto.
+    """
+
+    def __init__(self, strip):
+        self.__strip = strip
+        self.__height, self.__width = strip.getCanvas.shape[0:2]
+
+        # ------------------------------------------------------------------
+        # The layers from the bottom up, the blend of the layers up to and
+        # including each one, and the version of each layer in its blend.
+        # The blends below valid are up to date, and flattened is whether
+        # the LEDs hold the blend of the whole stack
+        # ------------------------------------------------------------------
+        self.__layers = []
+        self.__blends = []
+        self.__versions = []
+        self.__valid = 0
+        self.__flattened = False
+        self.__base = np.zeros((self.__height, self.__width, 3), dtype=np.uint8)
+
+    @property
+    def getLayers(self):
+        """Returns the names of the layers, from the bottom up."""
+        return [layer.getName for layer in self.__layers]
+
+    def getLayer(self, name):
+        """Returns the layer with this name."""
+        return self.__layers[self.__find(name)]
+
+    def __find(self, name):
+        """Returns the position of the layer with this name in the stack."""
+        for i, layer in enumerate(self.__layers):
+            if layer.getName == name:
+                return i
+
+        raise ValueError('There is no layer called {}.'.format(name))
+
+    def addLayer(self, name, size=None, offset=(0, 0), opacity=1.0, blend="NORMAL", index=None):
+        """
+        Adds a layer.
+
+        :type name: str
+        :param name: The name of the layer.
+
+        :type size: tuple or None
+        :param size: The (width, height) of the layer, or None for the size of the LEDs.
+
+        :type offset: tuple
+        :param offset: The (x, y) position of the top left of the layer on the LEDs.
+
+        :type opacity: float
+        :param opacity: How opaque the whole layer is (0.0-1.0).
+
+        :type blend: str
+        :param blend: The blend mode, one of :data:`blendlist`.
+
+        :type index: int or None
+        :param index: Where in the stack to add the layer (0 is the bottom), or None to add it on top.
+
+        :return: The new :class:`Layer`
+        """
+        if any(layer.getName == name for layer in self.__layers):
+            raise ValueError('There is already a layer called {}.'.format(name))
+
+        if size is None:
+            size = (self.__width, self.__height)
+        if index is None:
+            index = len(self.__layers)
+
+        layer = Layer(name, size, offset, opacity, blend)
+        self.__layers.insert(index, layer)
+        self.__blends.insert(index, np.zeros((self.__height, self.__width, 3), dtype=np.uint8))
+        self.__versions.insert(index, None)
+        self.__valid = min(self.__valid, index)
+        self.__flattened = False
+
+        return layer
+
+    def removeLayer(self, name):
+        """Removes the layer with this name."""
+        index = self.__find(name)
+
+        del self.__layers[index]
+        del self.__blends[index]
+        del self.__versions[index]
+        self.__valid = min(self.__valid, index)
+        self.__flattened = False
+
+    def moveLayer(self, name, index):
+        """
+        Moves a layer to another place in the stack.
+
+        :type name: str
+        :param name: The name of the layer.
+
+        :type index: int
+        :param index: Its new place in the stack (0 is the bottom).
+        """
+        current = self.__find(name)
+        layer = self.__layers.pop(current)
+        blend = self.__blends.pop(current)
+        self.__versions.pop(current)
+
+        self.__layers.insert(index, layer)
+        self.__blends.insert(index, blend)
+        self.__versions.insert(index, None)
+        self.__valid = min(self.__valid, current, index)
+        self.__flattened = False
+
+    def __blendLayer(self, layer, below, result):
+        """Blends a layer onto the blend of the layers below it, in one array operation."""
+        result[:] = below
+
+        x, y = layer.offset
+        left, top = max(x, 0), max(y, 0)
+        right = min(x + layer.getWidth, self.__width)
+        bottom = min(y + layer.getHeight, self.__height)
+
+        if left >= right or top >= bottom or layer.opacity == 0.0:
+            return
+
+        source = layer.getColours[top - y:bottom - y, left - x:right - x]
+        target = result[top:bottom, left:right]
+
+        colours = source[:, :, 0:3].astype(np.uint16)
+        under = target.astype(np.uint16)
+
+        if layer.blend == "ADD":
+            np.minimum(colours + under, 255, out=colours)
+        elif layer.blend == "MULTIPLY":
+            colours = (colours * under + 127) // 255
+        elif layer.blend == "MAX":
+            np.maximum(colours, under, out=colours)
+
+        alpha = source[:, :, 3:4].astype(np.uint16)
+        if layer.opacity < 1.0:
+            alpha = (alpha * int(round(layer.opacity * 255)) + 127) // 255
+
+        target[:] = (colours * alpha + under * (255 - alpha) + 127) // 255
+
+    def flatten(self):
+        """
+        Blends the layers onto the LEDs (without showing them). Only the layers from the lowest changed layer up are
+        blended again.
+
+        :return: Whether anything changed
+        """
+        first = self.__valid
+        for i in range(first):
+            if self.__versions[i] != self.__layers[i].getVersion:
+                first = i
+                break
+
+        if first == len(self.__layers) and self.__valid == first and self.__flattened:
+            return False
+
+        for i in range(first, len(self.__layers)):
+            below = self.__blends[i - 1] if i > 0 else self.__base
+            self.__blendLayer(self.__layers[i], below, self.__blends[i])
+            self.__versions[i] = self.__layers[i].getVersion
+
+        # ------------------------------------------------------------------
+        # With no layers left, the LEDs go back to the (black) base
+        # ------------------------------------------------------------------
+        self.__valid = len(self.__layers)
+        self.__flattened = True
+        self.__strip.getCanvas[:, :, 0:3] = self.__blends[-1] if self.__layers else self.__base
+
+        return True
+
+    def showLEDs(self):
+        """Blends the layers onto the LEDs and shows them."""
+        self.flatten()
+        self.__strip.showLEDs()
@@ -0,0 +1,349 @@
+"""
+.. module:: pixelpi
+   :platform: Unix
+   :synopsis: Whole-frame effects drawn straight onto the LEDs of a Strip or StripGroup
+
+Each effect works out the colours of every LED at once with numpy and writes them to the ``getCanvas`` of the
+:class:`Strip` (or :class:`StripGroup`) it is given. Call ``showLEDs()`` afterwards as usual. For example::
+
+    strip = Strip(1, 1024)
+    hue = 0.0
+
+    while True:
+        effects.rainbow(strip, hue)
+        strip.showLEDs()
+        hue += 0.01
+
+Positions along an LED string (or a :class:`StripGroup` of strings, where each string is a column) run down the
+strings, and positions on a matrix run across it, unless a ``direction`` of ``HORIZONTAL`` or ``VERTICAL`` is
+given.
+"""
+
+import numpy as np
+
+from .stripgroup import StripGroup
+
+directionlist = ["HORIZONTAL", "VERTICAL"]
+
+
+def hsvToRGB(hue, saturation=1.0, value=1.0):
+    """
+    Converts hue, saturation and value to red, green and blue, for whole arrays at once.
+
+    :type hue: float or numpy.ndarray
+    :param hue: The hue, where 0.0 and 1.0 are both red.
+
+    :type saturation: float or numpy.ndarray
+    :param saturation: The saturation (0.0-1.0).
+
+    :type value: float or numpy.ndarray
+    :param value: The value (0.0-1.0).
+
+    :return: A uint8 array with a last axis of (red, green, blue)
+    """
+    hue, saturation, value = np.broadcast_arrays(np.asarray(hue, dtype=float) % 1.0 * 6.0,
+                                                 np.asarray(saturation, dtype=float),
+                                                 np.asarray(value, dtype=float))
+    sector = hue.astype(int) % 6
+    fraction = hue - np.floor(hue)
+
+    p = value * (1.0 - saturation)
+    q = value * (1.0 - saturation * fraction)
+    t = value * (1.0 - saturation * (1.0 - fraction))
+
+    red = np.choose(sector, [value, q, p, p, t, value])
+    green = np.choose(sector, [t, value, value, q, p, p])
+    blue = np.choose(sector, [p, p, t, value, value, q])
+
+    return np.rint(np.stack([red, green, blue], axis=-1) * 255).astype(np.uint8)
+
+
+# ------------------------------------------------------------------
+# Fully saturated, full value colours around the colour wheel, so a
+# rainbow is a single table lookup
+# ------------------------------------------------------------------
+huetablesize = 1536
+_huetable = hsvToRGB(np.arange(huetablesize) / huetablesize)
+
+
+def makePalette(colours, size=256):
+    """
+    Makes a palette that blends evenly between a list of colours.
+
+    :type colours: list
+    :param colours: The (red, green, blue) colours, from the start of the palette to the end.
+
+    :type size: int
+    :param size: How many entries the palette has.
+
+    :return: A (size, 3) uint8 array of colours
+    """
+    colours = np.asarray(colours, dtype=float)
+    if colours.ndim != 2 or colours.shape[1] != 3:
+        raise ValueError('The palette colours must be a list of (r, g, b) tuples.')
+    if len(colours) == 1:
+        return np.repeat(colours.astype(np.uint8), size, axis=0)
+
+    stops = np.linspace(0.0, 1.0, len(colours))
+    positions = np.linspace(0.0, 1.0, size)
+    palette = [np.interp(positions, stops, colours[:, c]) for c in range(3)]
+
+    return np.rint(np.stack(palette, axis=-1)).astype(np.uint8)
+
+
+def _strings(strip, canvas):
+    """Returns whether the LEDs are an LED string, or a group of strings laid side by side as columns."""
+    if isinstance(strip, StripGroup):
+        return all(member.getWidth == 1 for member in strip.getStrips)
+
+    return canvas.shape[1] == 1
+
+
+def _positions(strip, canvas, direction):
+    """
+    Returns the position of each LED (0 at the start) along the direction, shaped to broadcast across the canvas,
+    and how many positions there are. By default positions run along LED strings and across matrices.
+    """
+    height, width = canvas.shape[0:2]
+
+    if direction is None:
+        direction = "VERTICAL" if _strings(strip, canvas) else "HORIZONTAL"
+    else:
+        direction = direction.upper()
+        if direction not in directionlist:
+            raise ValueError('The direction must be either HORIZONTAL or VERTICAL.')
+
+    if direction == "HORIZONTAL":
+        return np.arange(width).reshape(1, width), width
+    else:
+        return np.arange(height).reshape(height, 1), height
+
+
+def rainbow(strip, hue=0.0, spread=1.0 / 16, direction=None, saturation=1.0, value=1.0):
+    """
+    Draws a rainbow along the LEDs.
+
+    :type strip: Strip or StripGroup
+    :param strip: The LEDs to draw on.
+
+    :type hue: float
+    :param hue: The hue of the first LED (0.0-1.0). Change it each frame to cycle the colours.
+
+    :type spread: float
+    :param spread: How much the hue changes from one LED to the next (1/16 goes round the colour wheel every 16
+        LEDs).
+
+    :type direction: str or None
+    :param direction: ``HORIZONTAL``, ``VERTICAL`` or None for the default.
+
+    :type saturation: float
+    :param saturation: The saturation (0.0-1.0).
+
+    :type value: float
+    :param value: The value (0.0-1.0).
+    """
+    canvas = strip.getCanvas
+    positions, _ = _positions(strip, canvas, direction)
+    hues = hue + positions * spread
+
+    if saturation == 1.0 and value == 1.0:
+        colours = _huetable[(hues % 1.0 * huetablesize).astype(int) % huetablesize]
+    else:
+        colours = hsvToRGB(hues, saturation, value)
+
+    canvas[:, :, 0:3] = colours
+
+
+def gradient(strip, start, end, direction=None):
+    """
+    Draws a straight blend from one colour to another along the LEDs.
+
+    :type strip: Strip or StripGroup
+    :param strip: The LEDs to draw on.
+
+    :type start: tuple
+    :param start: The (red, green, blue) colour of the first LED.
+
+    :type end: tuple
+    :param end: The (red, green, blue) colour of the last LED.
+
+    :type direction: str or None
+    :param direction: ``HORIZONTAL``, ``VERTICAL`` or None for the default.
+    """
+    canvas = strip.getCanvas
+    positions, count = _positions(strip, canvas, direction)
+    palette = makePalette([start, end], size=count)
+
+    canvas[:, :, 0:3] = palette[positions]
+
+
+def radialGradient(strip, inner, outer, centre=None, radius=None):
+    """
+    Draws a blend from one colour at a centre point to another colour at a radius around it.
+
+    :type strip: Strip or StripGroup
+    :param strip: The LEDs to draw on.
+
+    :type inner: tuple
+    :param inner: The (red, green, blue) colour at the centre.
+
+    :type outer: tuple
+    :param outer: The (red, green, blue) colour at and beyond the radius.
+
+    :type centre: tuple or None
+    :param centre: The (x, y) centre, or None for the middle of the LEDs.
+
+    :type radius: float or None
+    :param radius: The radius in LEDs, or None for the distance from the centre to the furthest corner.
+    """
+    canvas = strip.getCanvas
+    height, width = canvas.shape[0:2]
+
+    if centre is None:
+        centre = ((width - 1) / 2.0, (height - 1) / 2.0)
+    cx, cy = centre
+
+    y, x = np.ogrid[0:height, 0:width]
+    distance = np.hypot(x - cx, y - cy)
+
+    if radius is None:
+        radius = max(distance.max(), 1.0)
+
+    applyPalette(strip, makePalette([inner, outer]), np.minimum(distance / radius, 1.0))
+
+
+def applyPalette(strip, palette, values):
+    """
+    Colours the LEDs by looking up values in a palette.
+
+    :type strip: Strip or StripGroup
+    :param strip: The LEDs to draw on.
+
+    :type palette: numpy.ndarray
+    :param palette: An (n, 3) array of colours, such as one from :func:`makePalette`.
+
+    :type values: numpy.ndarray
+    :param values: Values from 0.0 (the start of the palette) to 1.0 (the end), one per LED in the shape of the
+        canvas, or anything that broadcasts to it.
+    """
+    canvas = strip.getCanvas
+    palette = np.asarray(palette)
+    indexes = np.clip(np.rint(np.asarray(values, dtype=float) * (len(palette) - 1)), 0, len(palette) - 1)
+
+    canvas[:, :, 0:3] = palette[indexes.astype(int)]
+
+
+def fade(strip, amount=0.1):
+    """
+    Fades all of the LEDs towards black, for trails and fade outs.
+
+    :type strip: Strip or StripGroup
+    :param strip: The LEDs to fade.
+
+    :type amount: float
+    :param amount: How much to fade by, from 0.0 (not at all) to 1.0 (to black).
+    """
+    if not 0.0 <= amount <= 1.0:
+        raise ValueError('The fade amount must be between 0.0 and 1.0.')
+
+    canvas = strip.getCanvas
+    keep = int(round((1.0 - amount) * 256))
+
+    canvas[:, :, 0:3] = (canvas[:, :, 0:3].astype(np.uint16) * keep) >> 8
+    canvas[:, :, 4:] = (canvas[:, :, 4:].astype(np.uint16) * keep) >> 8
+
+
+def sparkle(strip, density=0.01, rgb=(255, 255, 255), rng=None):
+    """
+    Lights random LEDs.
+
+    :type strip: Strip or StripGroup
+    :param strip: The LEDs to draw on.
+
+    :type density: float
+    :param density: The chance of each LED being lit (0.0-1.0).
+
+    :type rgb: tuple
+    :param rgb: The (red, green, blue) colour of the sparkles.
+
+    :type rng: numpy.random.Generator or None
+    :param rng: The random number generator to use, or None for numpy's default.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    canvas = strip.getCanvas
+    canvas[rng.random(canvas.shape[0:2]) < density, 0:3] = rgb
+
+
+class Fire:
+    """
+    A flickering fire that rises along the LEDs. On a string, or a group of strings, it rises from the first LED of
+    each string; on a matrix it rises from the bottom row (the highest y) to the top, with each column burning on its
+    own. For example::
+
+        fire = effects.Fire(strip)
+
+        while True:
+            fire.update()
+            strip.showLEDs()
+            time.sleep(0.03)
+
+    :type strip: Strip or StripGroup
+    :param strip: The LEDs to draw on.
+
+    :type cooling: int
+    :param cooling: How quickly the flames cool (20-100 works well). More cooling gives shorter flames.
+
+    :type sparking: int
+    :param sparking: The chance (out of 255) of a new spark at the base each frame.
+
+    :type palette: numpy.ndarray or None
+    :param palette: The colours from cold to hot, or None for black, red, yellow and white.
+
+    :type rng: numpy.random.Generator or None
+    :param rng: The random number generator to use, or None for numpy's default.
+    """
+
+    def __init__(self, strip, cooling=55, sparking=120, palette=None, rng=None):
+        self.__strip = strip
+        self.__cooling = cooling
+        self.__sparking = sparking
+        self.__rng = np.random.default_rng() if rng is None else rng
+
+        if palette is None:
+            palette = makePalette([(0, 0, 0), (255, 0, 0), (255, 255, 0), (255, 255, 255)])
+        self.__palette = np.asarray(palette)
+
+        canvas = strip.getCanvas
+        height, width = canvas.shape[0:2]
+        self.__rising = not _strings(strip, canvas)
+
+        # ------------------------------------------------------------------
+        # The heat of each LED, from the base (row 0) to the tip
+        # ------------------------------------------------------------------
+        self.__heat = np.zeros((height, width), dtype=np.int16)
+
+    def update(self):
+        """Moves the fire on by one frame and draws it."""
+        heat = self.__heat
+        height, width = heat.shape
+        rng = self.__rng
+
+        # Everything cools a little
+        cooldown = rng.integers(0, (self.__cooling * 10) // height + 3, size=heat.shape)
+        np.maximum(heat - cooldown, 0, out=heat)
+
+        # Heat drifts up and diffuses
+        if height > 2:
+            heat[2:] = (heat[1:-1] + 2 * heat[:-2]) // 3
+
+        # New sparks near the base
+        sparks = rng.integers(0, 256, size=width) < self.__sparking
+        rows = rng.integers(0, min(7, height), size=width)
+        columns = np.flatnonzero(sparks)
+        heat[rows[columns], columns] = np.minimum(heat[rows[columns], columns] + rng.integers(160, 256, len(columns)),
+                                                 255)
+
+        values = heat[::-1] if self.__rising else heat
+        applyPalette(self.__strip, self.__palette, values / 255.0)
@@ -0,0 +1,397 @@
+"""
+.. module:: pixelpi
+   :platform: Unix
+   :synopsis: Receiving frames from a lighting console over the network, using E1.31 (sACN) or Art-Net
+
+A :class:`NetworkReceiver` listens for DMX universes sent over UDP and copies them onto the LEDs of one or more
+:class:`Strip` or :class:`StripGroup` objects, showing each frame once all of its universes have arrived. For
+example::
+
+    receiver = NetworkReceiver("E131")
+    receiver.addTarget(strip1, universe=1)
+    receiver.addTarget(strip2, universe=4)
+
+    asyncio.run(receiver.serve())
+
+Each universe carries up to 512 DMX slots, which is 170 RGB LEDs (or 128 RGBW LEDs), so long strings and large
+matrices take several consecutive universes. The LEDs are filled from the start of a string, or row by row on a
+matrix.
+"""
+
+import asyncio
+import socket
+import struct
+import time
+
+import numpy as np
+
+from .strip import Strip
+
+protocollist = ["E131", "ARTNET"]
+
+ports = {"E131": 5568, "ARTNET": 6454}
+
+# ------------------------------------------------------------------
+# E1.31 packet fields (ANSI E1.31-2018)
+# ------------------------------------------------------------------
+_e131id = b"\x00\x10\x00\x00ASC-E1.17\x00\x00\x00"
+_e131data = 0x00000004
+_e131extended = 0x00000008
+_e131framingdata = 0x00000002
+_e131framingsync = 0x00000001
+_e131preview = 0x80
+_e131terminated = 0x40
+
+# ------------------------------------------------------------------
+# Art-Net packet fields (Art-Net 4)
+# ------------------------------------------------------------------
+_artnetid = b"Art-Net\x00"
+_artdmx = 0x5000
+_artsync = 0x5200
+
+# How long to keep waiting for sync packets after the last one (seconds)
+_synctimeout = 4.0
+
+# ArtSync has no sync address, so it is kept under 0, which E1.31 never syncs to
+_artsyncaddress = 0
+
+
+class _Target:
+    """The LEDs of one Strip or StripGroup and the universes that fill them."""
+
+    def __init__(self, strip, universe, layout, ledsperuniverse):
+        canvas = strip.getCanvas
+
+        self.strip = strip
+        self.pixels = canvas.reshape(-1, canvas.shape[2])
+        self.columns, self.values = Strip.layoutColumns(layout, canvas.shape[2])
+        self.ledsperuniverse = ledsperuniverse
+        self.universes = list(range(universe, universe + -(-len(self.pixels) // ledsperuniverse)))
+        self.received = np.zeros(len(self.universes), dtype=bool)
+        self.pending = False
+        self.syncaddress = None
+        self.timer = None
+
+
+class NetworkReceiver(asyncio.DatagramProtocol):
+    """
+    Receives E1.31 (sACN) or Art-Net DMX universes and shows them on the LEDs.
+
+    A frame is shown when the console sends a sync packet (E1.31 synchronisation or ArtSync), or, if it does not use
+    them, once every universe of a target has arrived. An E1.31 sync packet only shows the targets whose universes
+    named its sync address. If no sync packet arrives for 4 seconds, a frame still waiting for one is shown, and
+    frames are shown as their universes arrive again until the sync packets come back. If some universes of a frame
+    never arrive, the frame is shown anyway ``timeout`` seconds after its first universe, and counted in
+    ``incompleteframes``.
+
+    :type protocol: str
+    :param protocol: ``E131`` or ``ARTNET``.
+
+    :type timeout: float
+    :param timeout: The most seconds to wait for the rest of a frame's universes.
+    """
+
+    statslist = ["packets", "badpackets", "ignoredpackets", "outoforder", "lostpackets", "syncpackets", "frames",
+                 "incompleteframes"]
+
+    def __init__(self, protocol="E131", timeout=0.1):
+        protocol = protocol.upper()
+        if protocol not in protocollist:
+            raise ValueError('The protocol must be either E131 or ARTNET.')
+        if timeout <= 0:
+            raise ValueError('The timeout must be more than 0.')
+
+        self.__protocol = protocol
+        self.__timeout = timeout
+        self.__targets = []
+        self.__universes = {}
+        self.__sequences = {}
+        self.__synctimes = {}
+        self.__transport = None
+        self.__loop = None
+        self.__stats = dict.fromkeys(self.statslist, 0)
+
+    @property
+    def getProtocol(self):
+        """Returns the protocol received, ``E131`` or ``ARTNET``."""
+        return self.__protocol
+
+    @property
+    def getUniverses(self):
+        """Returns the universes that are mapped onto LEDs, in order."""
+        return sorted(self.__universes)
+
+    @property
+    def getStats(self):
+        """
+        Returns a dictionary of what has been received:
+
+            * ``packets`` - all packets received
+            * ``badpackets`` - packets that were not valid E1.31 or Art-Net
+            * ``ignoredpackets`` - valid packets for universes not mapped onto any LEDs, or preview data
+            * ``outoforder`` - E1.31 packets dropped because they arrived after a later packet
+            * ``lostpackets`` - E1.31 packets missing from the sequence numbers
+            * ``syncpackets`` - sync packets received
+            * ``frames`` - frames shown
+            * ``incompleteframes`` - frames shown after the timeout with some universes missing
+        """
+        return dict(self.__stats)
+
+    def resetStats(self):
+        """Sets all of the :class:`getStats` counters back to 0."""
+        self.__stats = dict.fromkeys(self.statslist, 0)
+
+    def addTarget(self, strip, universe=1, layout="RGB", ledsperuniverse=None):
+        """
+        Maps consecutive universes onto the LEDs of a Strip or StripGroup.
+
+        :type strip: Strip or StripGroup
+        :param strip: The LEDs.
+
+        :type universe: int
+        :param universe: The first universe (1-63999 for E1.31, 0-32767 for Art-Net).
+
+        :type layout: str
+        :param layout: The slots of each LED, ``RGB`` or ``RGBW``, or another of :data:`Strip.patternlayouts`.
+
+        :type ledsperuniverse: int or None
+        :param ledsperuniverse: How many LEDs each universe holds, or None for as many as fit in 512 slots.
+
+        :return: The universes mapped onto the LEDs
+        """
+        _, values = Strip.layoutColumns(layout, 5)
+        if ledsperuniverse is None:
+            ledsperuniverse = 512 // values
+        elif not 0 < ledsperuniverse * values <= 512:
+            raise ValueError('A universe can hold at most {} LEDs in this layout.'.format(512 // values))
+
+        target = _Target(strip, universe, layout, ledsperuniverse)
+
+        lowest, highest = (1, 63999) if self.__protocol == "E131" else (0, 32767)
+        if target.universes[0] < lowest or target.universes[-1] > highest:
+            raise ValueError('The universes must be between {} and {}.'.format(lowest, highest))
+        for u in target.universes:
+            if u in self.__universes:
+                raise ValueError('Universe {} is already mapped onto LEDs.'.format(u))
+
+        for i, u in enumerate(target.universes):
+            self.__universes[u] = (target, i)
+        self.__targets.append(target)
+
+        return list(target.universes)
+
+    # ------------------------------------------------------------------
+    # Networking
+    # ------------------------------------------------------------------
+    async def start(self, host="0.0.0.0", port=None, multicast=True):
+        """
+        Starts listening for packets on the running event loop.
+
+        :type host: str
+        :param host: The address to listen on.
+
+        :type port: int or None
+        :param port: The UDP port, or None for the standard port of the protocol (5568 or 6454).
+
+        :type multicast: bool
+        :param multicast: For E1.31, whether to join the multicast group of each mapped universe.
+        """
+        if port is None:
+            port = ports[self.__protocol]
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+
+        if multicast and self.__protocol == "E131":
+            interface = socket.inet_aton("0.0.0.0" if host in ("", "0.0.0.0") else host)
+            for u in self.__universes:
+                group = socket.inet_aton("239.255.{}.{}".format(u >> 8, u & 0xff))
+                sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, group + interface)
+
+        loop = asyncio.get_running_loop()
+        await loop.create_datagram_endpoint(lambda: self, sock=sock)
+
+    async def serve(self, host="0.0.0.0", port=None, multicast=True):
+        """Starts listening (see :class:`start()`) and keeps going until :class:`stop()` is called."""
+        await self.start(host, port, multicast)
+        while self.__transport is not None:
+            await asyncio.sleep(0.5)
+
+    def stop(self):
+        """Stops listening."""
+        if self.__transport is not None:
+            self.__transport.close()
+
+    def connection_made(self, transport):
+        self.__transport = transport
+        self.__loop = asyncio.get_running_loop()
+
+    def connection_lost(self, exc):
+        self.__transport = None
+        for target in self.__targets:
+            self.__cancelTimer(target)
+
+    def datagram_received(self, data, addr):
+        """Handles one packet."""
+        self.__stats["packets"] += 1
+
+        if self.__protocol == "E131":
+            self.__receiveE131(data)
+        else:
+            self.__receiveArtNet(data)
+
+    # ------------------------------------------------------------------
+    # Decoding
+    # ------------------------------------------------------------------
+    def __receiveE131(self, data):
+        """Decodes an E1.31 data or synchronisation packet."""
+        if len(data) < 49 or data[0:16] != _e131id:
+            self.__stats["badpackets"] += 1
+            return
+
+        rootvector, = struct.unpack_from(">I", data, 18)
+        framingvector, = struct.unpack_from(">I", data, 40)
+
+        if rootvector == _e131extended and framingvector == _e131framingsync:
+            syncaddress, = struct.unpack_from(">H", data, 45)
+            self.__stats["syncpackets"] += 1
+            self.__sync(syncaddress)
+            return
+
+        if rootvector != _e131data or framingvector != _e131framingdata or len(data) < 126:
+            self.__stats["badpackets"] += 1
+            return
+
+        syncaddress, sequence, options, universe = struct.unpack_from(">HBBH", data, 109)
+        startcode = data[125]
+        count, = struct.unpack_from(">H", data, 123)
+
+        if options & (_e131preview | _e131terminated) or startcode != 0 or universe not in self.__universes:
+            self.__stats["ignoredpackets"] += 1
+            return
+
+        # ------------------------------------------------------------------
+        # Drop packets that arrive after a later one (E1.31 6.7.2), and count
+        # the ones missing from the sequence
+        # ------------------------------------------------------------------
+        last = self.__sequences.get(universe)
+        self.__sequences[universe] = sequence
+        if last is not None:
+            step = (sequence - last) & 0xff
+            if step == 0 or step > 0xff - 20:
+                self.__sequences[universe] = last
+                self.__stats["outoforder"] += 1
+                return
+            self.__stats["lostpackets"] += step - 1
+
+        if syncaddress == 0 or not self.__syncing(syncaddress):
+            syncaddress = None
+        self.__receiveSlots(universe, data, 126, min(count - 1, len(data) - 126), syncaddress)
+
+    def __receiveArtNet(self, data):
+        """Decodes an ArtDmx or ArtSync packet."""
+        if len(data) < 12 or data[0:8] != _artnetid:
+            self.__stats["badpackets"] += 1
+            return
+
+        opcode, = struct.unpack_from("<H", data, 8)
+
+        if opcode == _artsync:
+            self.__stats["syncpackets"] += 1
+            self.__sync(_artsyncaddress)
+            return
+
+        if opcode != _artdmx or len(data) < 18:
+            self.__stats["ignoredpackets" if opcode != _artdmx else "badpackets"] += 1
+            return
+
+        subuni, net, length = struct.unpack_from(">BBH", data, 14)
+        universe = (net & 0x7f) << 8 | subuni
+
+        if universe not in self.__universes:
+            self.__stats["ignoredpackets"] += 1
+            return
+
+        syncaddress = _artsyncaddress if self.__syncing(_artsyncaddress) else None
+        self.__receiveSlots(universe, data, 18, min(length, len(data) - 18), syncaddress)
+
+    # ------------------------------------------------------------------
+    # Framing
+    # ------------------------------------------------------------------
+    def __receiveSlots(self, universe, data, offset, slots, syncaddress):
+        """
+        Copies the DMX slots of a universe onto its LEDs in one array operation, then shows the frame if it is
+        complete (or, with a ``syncaddress``, leaves it for the next sync packet to that address).
+        """
+        target, position = self.__universes[universe]
+
+        start = position * target.ledsperuniverse
+        leds = min(target.ledsperuniverse, len(target.pixels) - start, max(slots, 0) // target.values)
+
+        if leds > 0:
+            values = np.frombuffer(data, dtype=np.uint8, count=leds * target.values, offset=offset)
+            target.pixels[start:start + leds, target.columns] = values.reshape(leds, target.values)
+
+        target.received[position] = True
+        target.pending = True
+        target.syncaddress = syncaddress
+
+        # ------------------------------------------------------------------
+        # A frame waiting for a sync packet is shown anyway once the sync
+        # packets to its address have stopped
+        # ------------------------------------------------------------------
+        if syncaddress is not None:
+            if target.timer is None and self.__loop is not None:
+                wait = self.__synctimes[syncaddress] + _synctimeout - time.monotonic()
+                target.timer = self.__loop.call_later(max(wait, self.__timeout), self.__syncTimedOut, target)
+            return
+
+        if target.received.all():
+            self.__showTarget(target)
+        elif target.timer is None and self.__loop is not None:
+            target.timer = self.__loop.call_later(self.__timeout, self.__timedOut, target)
+
+    def __syncing(self, syncaddress):
+        """
+        Returns whether frames are being shown by sync packets to a sync address, which is until none have arrived
+        for ``_synctimeout`` seconds (E1.31 6.3.3.1, Art-Net ArtSync).
+        """
+        synctime = self.__synctimes.get(syncaddress)
+        return synctime is not None and time.monotonic() - synctime < _synctimeout
+
+    def __sync(self, syncaddress):
+        """Shows every target that has received data waiting for a sync packet to this address."""
+        self.__synctimes[syncaddress] = time.monotonic()
+
+        for target in self.__targets:
+            if target.pending and target.syncaddress == syncaddress:
+                self.__showTarget(target)
+
+    def __syncTimedOut(self, target):
+        """Shows a frame that is still waiting for a sync packet after the sync packets stopped."""
+        target.timer = None
+        if target.pending:
+            self.__showTarget(target)
+
+    def __timedOut(self, target):
+        """Shows a frame whose missing universes did not arrive in time."""
+        target.timer = None
+        if target.pending:
+            self.__stats["incompleteframes"] += 1
+            self.__showTarget(target)
+
+    def __cancelTimer(self, target):
+        """Cancels the timeout of a target's frame."""
+        if target.timer is not None:
+            target.timer.cancel()
+            target.timer = None
+
+    def __showTarget(self, target):
+        """Shows a target's frame and starts waiting for the next one."""
+        self.__cancelTimer(target)
+        target.received[:] = False
+        target.pending = False
+
+        target.strip.showLEDs()
+        self.__stats["frames"] += 1
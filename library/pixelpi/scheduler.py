@@ -0,0 +1,147 @@
+"""
+.. module:: pixelpi
+   :platform: Unix
+   :synopsis: Running animations at a steady frame rate
+"""
+
+import time
+
+
+class FrameScheduler:
+    """
+    Calls a render function at a steady frame rate and shows the LEDs after each frame.
+
+    Frames are timed from when the scheduler started rather than from the end of the last frame, so the frame rate
+    does not drift as the time taken to draw each frame changes. If a frame takes so long that the next one is already
+    due, the frames that were missed are skipped rather than run late. For example::
+
+        strip = Strip(4, (8, 32), shape="zmatrix", brightness=30)
+
+        def render(frame, t):
+            strip.shift("right", 1)
+
+        scheduler = FrameScheduler(render, strip, fps=30)
+        scheduler.run(duration=10)
+        print(scheduler.getStats)
+
+    The render function is passed the frame number and the time (in seconds from the start) that the frame is due,
+    so animations keep to time even when frames are skipped.
+
+    Passing a simulated ``clock`` and ``sleep`` (and a fake PixelStrip) makes the frame counts repeatable, for
+    benchmarking without LEDs. Every time in :class:`getStats` is measured with the same ``clock``; the split of the
+    strips' own time between encoding and sending is in :class:`Strip.getStats`.
+
+    :type render: function
+    :param render: The function called to draw each frame, as ``render(frame, t)``.
+
+    :type strips: Strip, StripGroup or list
+    :param strips: The strips (or groups of strips) to show after each frame.
+
+    :type fps: float
+    :param fps: The target number of frames per second.
+
+    :type clock: function
+    :param clock: Returns the current time in seconds (default ``time.monotonic``).
+
+    :type sleep: function
+    :param sleep: Waits for a number of seconds (default ``time.sleep``).
+    """
+
+    statslist = ["frames", "lateframes", "skippedframes", "rendertime", "showtime", "elapsed"]
+
+    def __init__(self, render, strips, fps=30, clock=time.monotonic, sleep=time.sleep):
+        if fps <= 0:
+            raise ValueError('The frame rate must be more than 0.')
+
+        if type(strips) not in (list, tuple):
+            strips = [strips]
+
+        self.__render = render
+        self.__strips = list(strips)
+        self.__period = 1.0 / fps
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__running = False
+        self.__stats = dict.fromkeys(self.statslist, 0)
+
+    @property
+    def getStats(self):
+        """
+        Returns a dictionary of how the scheduler has performed:
+
+            * ``frames`` - the number of frames drawn and shown
+            * ``fps`` - the frame rate achieved
+            * ``lateframes`` - frames that finished after the next frame was due
+            * ``skippedframes`` - frames not drawn because the scheduler had fallen behind
+            * ``rendertime`` - the total seconds spent in the render function
+            * ``showtime`` - the total seconds spent in the strips' ``showLEDs()`` (encoding and sending the LED
+              colours, or for ``threaded`` strips handing them to the output threads)
+            * ``elapsed`` - the total seconds the scheduler has been running
+        """
+        stats = dict(self.__stats)
+        stats["fps"] = stats["frames"] / stats["elapsed"] if stats["elapsed"] > 0 else 0.0
+
+        return stats
+
+    def resetStats(self):
+        """Sets all of the :class:`getStats` counters back to 0."""
+        self.__stats = dict.fromkeys(self.statslist, 0)
+
+    def run(self, frames=None, duration=None):
+        """
+        Runs the animation until ``frames`` frames have been shown, ``duration`` seconds have passed or
+        :class:`stop()` is called (from the render function or another thread).
+
+        :type frames: int or None
+        :param frames: The number of frames to show, or None for no limit.
+
+        :type duration: float or None
+        :param duration: The number of seconds to run for, or None for no limit.
+        """
+        self.__running = True
+        start = self.__clock()
+        frame = 0
+        shown = 0
+
+        while self.__running:
+            due = frame * self.__period
+            if duration is not None and due >= duration:
+                break
+            if frames is not None and shown >= frames:
+                break
+
+            renderstart = self.__clock()
+            self.__render(frame, due)
+            renderend = self.__clock()
+
+            for strip in self.__strips:
+                strip.showLEDs()
+            showend = self.__clock()
+
+            self.__stats["frames"] += 1
+            self.__stats["rendertime"] += renderend - renderstart
+            self.__stats["showtime"] += showend - renderend
+            shown += 1
+
+            # ------------------------------------------------------------------
+            # Wait until the next frame is due. If it is already overdue, skip
+            # to the next frame that can still be shown on time
+            # ------------------------------------------------------------------
+            frame += 1
+            now = self.__clock() - start
+            wait = frame * self.__period - now
+
+            if wait > 0:
+                self.__sleep(wait)
+            elif wait < 0:
+                self.__stats["lateframes"] += 1
+                behind = int(-wait / self.__period)
+                self.__stats["skippedframes"] += behind
+                frame += behind
+
+        self.__stats["elapsed"] += self.__clock() - start
+        self.__running = False
+
+    def stop(self):
+        """Stops the scheduler after the current frame."""
+        self.__running = False
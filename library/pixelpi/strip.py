@@ -4,8 +4,13 @@
    :synopsis: Control of WS281x LEDs with a Raspberry Pi
 """
 
-from gpiozero import OutputDevice
-from rpi_ws281x import PixelStrip, ws
+import threading
+import time
+
+import numpy as np
+
+from .backend import WS281xBackend
+from .colour import ColourCorrection, rgbToRGBW
 
 
 class Strip:
@@ -59,23 +64,88 @@ class Strip:
             ``WS2811_BRG``,
             ``WS2811_BGR``
 
+        The ``SK6812W`` and ``SK6812_...W`` types (:data:`rgbwtypeslist`) have a white LED as well, and each LED has a
+        white value alongside its red, green and blue.
+
     :type brightness: int
-    :param brightness: The default brightness for all LEDs (0-255).
+    :param brightness: The default brightness for all LEDs (0-255). Each LED's own brightness is applied when the
+        LEDs are shown.
+
+    :type gamma: float or None
+    :param gamma: If set, gamma correction (e.g. ``2.2``) is applied to the colours when the LEDs are shown. A
+        shortcut for ``correction=ColourCorrection(gamma=gamma)``.
+
+    :type correction: ColourCorrection or None
+    :param correction: The gamma, colour and power limit correction applied to the colours when the LEDs are shown.
+
+    :type threaded: bool
+    :param threaded: If ``True``, the LEDs are updated by a background thread so that :class:`showLEDs()` and
+        :class:`swapLEDs()` return straight away and the next frame can be drawn while the last is being sent.
+
+    :type backend: object or None
+    :param backend: Where the LED colours are sent. Defaults to a :class:`WS281xBackend` driving the LEDs on the
+        terminal; a :class:`SimulatorBackend` runs without any hardware.
+
+    :type extractwhite: bool
+    :param extractwhite: On RGBW LEDs, whether the white shared by the red, green and blue of each LED is moved onto
+        the white LED when shown (see :func:`colour.rgbToRGBW`), so that colours drawn as RGB get proper whites.
+
+    :type maxcurrent: float or None
+    :param maxcurrent: The most current (in milliamps) the LEDs on the terminal may draw. Any frame that would draw
+        more, as estimated from :data:`ledcurrents`, is dimmed evenly until it fits. None for no limit.
+
+    :type dither: bool
+    :param dither: Whether the colours are temporally dithered, so that fades stay smooth at low brightness (see
+        :class:`dither`).
     """
 
     ledtypeslist = ["WS2812", "SK6812", "SK6812W", "SK6812_RGBW", "SK6812_RBGW", "SK6812_GRBW", "SK6812_GBRW",
                     "SK6812_BRGW", "SK6812_BGRW", "WS2811_RGB", "WS2811_RBG", "WS2811_GRB", "WS2811_GBR",
                     "WS2811_BRG", "WS2811_BGR"]
 
+    rgbwtypeslist = [ledtype for ledtype in ledtypeslist if ledtype.startswith("SK6812") and ledtype.endswith("W")]
+
     matrixshapelist = ["zmatrix", "matrix"]
     stringshapelist = ["straight", "reverse"]
     allshapeslist = matrixshapelist + stringshapelist
 
     rotatelist = ["LEFT", "RIGHT", "UP", "DOWN"]
 
+    anglelist = [90, 180, 270]
+
     mirrorlist = ["HORIZONTAL", "VERTICAL"]
 
-    def __init__(self, terminal, size, shape='straight', ledtype='WS2812', brightness=255):
+    # ------------------------------------------------------------------
+    # The current each type of LED draws, in milliamps, as (each colour
+    # channel at full, the LED with all channels off). The WS2811 figures
+    # are per IC, which on most strings drives a single pixel
+    # ------------------------------------------------------------------
+    ledcurrents = {ledtype: (18.5, 1.0) if ledtype.startswith("WS2811") else (20.0, 1.0) for ledtype in ledtypeslist}
+
+    # ------------------------------------------------------------------
+    # The layouts of the values of each LED in a pattern, and where each
+    # value is held in the pixel array
+    # ------------------------------------------------------------------
+    patternlayouts = {"RGB": [0, 1, 2], "RGBW": [0, 1, 2, 4], "RGB_BRIGHTNESS": [0, 1, 2, 3],
+                      "RGB_BRIGHTNESS_W": [0, 1, 2, 3, 4]}
+
+    exportlist = ["SNAPSHOT", "BYTES"]
+
+    # ------------------------------------------------------------------
+    # The dithering thresholds, in the bit-reversed order that spreads
+    # the frames each LED is rounded up in evenly over the cycle
+    # ------------------------------------------------------------------
+    ditherlevels = [0, 4, 2, 6, 1, 5, 3, 7]
+
+    statslist = ["framesshown", "framesskipped", "framesdropped", "pixelsencoded", "pixelsskipped", "latencylast",
+                 "latencymax", "latencytotal", "encodetime", "showtime", "powerlimited", "framesdithered"]
+
+    __scaletables = {}
+    __finetables = {}
+
+    def __init__(self, terminal, size, shape='straight', ledtype='WS2812', brightness=255, gamma=None,
+                 threaded=False, backend=None, correction=None, maxcurrent=None, extractwhite=True,
+                 dither=False):
         # ---------------------------------------------
         # Which terminal connection is being used (1 to 4)
         # ---------------------------------------------
@@ -106,13 +176,12 @@ class Strip:
             raise ValueError('This terminal type is not supported.')
         self.__striptype = ledtype
 
-        supportedstriptypes = {}
-        for t in ws.__dict__:
-            if '_STRIP' in t:
-                k = t.replace('_STRIP', '')
-                v = getattr(ws, t)
-                supportedstriptypes[k] = v
-        self.__internalstriptype = supportedstriptypes[ledtype]
+        # ------------------------------------------------------------------
+        # The values held for each LED: red, green, blue and brightness,
+        # then white on RGBW LEDs
+        # ------------------------------------------------------------------
+        self.__channels = 5 if ledtype in self.rgbwtypeslist else 4
+        self.__extractwhite = bool(extractwhite)
 
         # ---------------
         # The terminal shape
@@ -150,26 +219,97 @@ class Strip:
         # -----------------------------------
         self.__brightness = self.__checkBrightness(brightness)
 
-        # -----------------------------------------------
-        # A list to hold the led colours and brightness
-        # -----------------------------------------------
-        self.__pixels = [[0, 0, 0, self.__brightness]] * self.__striplength
-
-        # ----------------------------
-        # Set up the rpi_ws281x callingclass
-        # ----------------------------
-        self.__strip = PixelStrip(self.__striplength, self.__controlpin, 800000, 10, False, self.__brightness,
-                                  self.__channel, self.__internalstriptype)
-
-        # ---------------------
-        # Start the terminal logic
-        # ---------------------
-        self.__strip.begin()
+        # ------------------------------------------------------------------
+        # The table used to correct each colour and scale it by its LED's
+        # brightness when shown, indexed by [channel, brightness, colour]
+        # ------------------------------------------------------------------
+        if correction is None:
+            correction = ColourCorrection(gamma=gamma)
+        elif gamma is not None:
+            raise ValueError('Give either a gamma or a correction, not both.')
+        self.__correction = correction
+        self.__scaletable = self.__scaleTable(correction)
+        self.__bgr = np.array([2, 1, 0])
+
+        # ------------------------------------------------------------------
+        # A (height, width, channels) array to hold the led colours and
+        # brightness in logical (x, y) order, and an (N, channels) view of
+        # it, one row of (red, green, blue, brightness[, white]) per LED
+        # ------------------------------------------------------------------
+        self.__canvas = np.zeros((self.__height, self.__width, self.__channels), dtype=np.uint8)
+        self.__pixels = self.__canvas.reshape(self.__striplength, self.__channels)
+        self.__pixels[:, 3] = self.__brightness
+
+        # ------------------------------------------------------------------
+        # The viewport: shift() moves where the canvas starts rather than
+        # moving the pixels, so (x, y) is held in the canvas at
+        # [(y + yoffset) % height, (x + xoffset) % width]
+        # ------------------------------------------------------------------
+        self.__yoffset = 0
+        self.__xoffset = 0
+        self.__wiring = None
+
+        # ------------------------------------------------------------------
+        # Which LEDs (in logical order) have changed since the last
+        # showLEDs(), and a copy of the shown pixels to compare against once
+        # the pixel array has been handed out by getLEDs() or getCanvas
+        # ------------------------------------------------------------------
+        self.__dirty = np.ones(self.__striplength, dtype=bool)
+        self.__shown = None
+        self.__stats = dict.fromkeys(self.statslist, 0)
+
+        # ------------------------------------------------------------------
+        # The lookup tables between logical (x, y) positions and the order
+        # the LEDs are wired in
+        # ------------------------------------------------------------------
+        self.__physical, self.__logical = self.__buildMap()
+
+        # ---------------------------------------------------------
+        # Start the backend that sends the LED colours to the LEDs
+        # ---------------------------------------------------------
+        if backend is None:
+            backend = WS281xBackend()
+        self.__backend = backend
+        self.__backend.begin(self.__striplength, self.__controlpin, self.__channel, self.__onoffpin, ledtype)
+
+        # ------------------------------------------------------------------
+        # The frame as it is sent to the LEDs: one 32-bit (white, red, green,
+        # blue) colour word per LED in wiring order, and its bytes
+        # ------------------------------------------------------------------
+        self.__wordbytes = np.zeros((self.__striplength, 4), dtype=np.uint8)
+        self.__words = self.__wordbytes.view('<u4').reshape(self.__striplength)
+
+        # ------------------------------------------------------------------
+        # The power limit: the most current the terminal may draw, the scale
+        # set by a StripGroup sharing a budget across the board, and the
+        # dimmed copy of the frame sent when either is in force
+        # ------------------------------------------------------------------
+        self.__maxcurrent = self.__checkCurrent(maxcurrent)
+        self.__powerscale = 1.0
+        self.__current = 0.0
+        self.__limited = False
+        self.__limitwide = np.zeros((self.__striplength, 4), dtype=np.uint16)
+        self.__limitbytes = np.zeros((self.__striplength, 4), dtype=np.uint8)
+        self.__limitwords = self.__limitbytes.view('<u4').reshape(self.__striplength)
+        self.__allleds = np.arange(self.__striplength)
+
+        # ------------------------------------------------------------------
+        # Temporal dithering: the frame in 8.8 fixed point (wiring order),
+        # the threshold added to each of its values on each frame of the
+        # cycle, and whether any value has a fraction to dither
+        # ------------------------------------------------------------------
+        self.__dither = False
+        self.__dithering = False
+        self.__ditherphase = 0
+        self.__finetable = None
+        self.__fineframe = None
+        self.__ditherwide = None
+        self.__dithertable = None
+        self.dither = dither
 
         # -------------------------------------------------------------------
-        # Set up the pin which defines whether the terminal is written to or not
+        # Enable writing to the terminal
         # -------------------------------------------------------------------
-        self.__statuspin = OutputDevice(self.__onoffpin, active_high=False, initial_value=False)
         self.updateStatus = True
 
         # ---------------
@@ -177,9 +317,42 @@ class Strip:
         # ---------------
         self.clearLEDs()
 
+        # ------------------------------------------------------------------
+        # In threaded mode, the front buffer the output thread sends to the
+        # LEDs, which of its LEDs have changed, and when it was last swapped
+        # ------------------------------------------------------------------
+        self.__outputthread = None
+        if threaded:
+            self.__front = self.__pixels.copy()
+            self.__frontdirty = np.zeros(self.__striplength, dtype=bool)
+            self.__frontwaiting = False
+            self.__frontwiring = None
+            self.__swaptime = 0.0
+            self.__outputcondition = threading.Condition()
+            self.__outputrunning = True
+            self.__outputthread = threading.Thread(target=self.__outputLoop, daemon=True)
+            self.__outputthread.start()
+
     def __del__(self):
-        """Disposes of the rpi_ws281x callingclass"""
-        del self.__strip
+        """Stops the output thread and disposes of the backend (if __init__ got as far as setting them up)"""
+        self.close(timeout=1.0)
+
+    def close(self, timeout=None):
+        """
+        Stops the output thread of a ``threaded`` Strip (see :class:`stopThread()`) and then disposes of the backend.
+        The Strip cannot show the LEDs again afterwards.
+
+        :type timeout: float or None
+        :param timeout: The most seconds to wait for the output thread, or None to wait until it has stopped. If it
+            is still running after this, the backend is left open for it.
+        """
+        if self.__dict__.get('_Strip__outputthread') is not None and not self.stopThread(timeout):
+            return
+
+        backend = self.__dict__.get('_Strip__backend')
+        if backend is not None:
+            self.__backend = None
+            backend.close()
 
     @staticmethod
     def __version():
@@ -200,6 +373,175 @@ class Strip:
         """Returns the height of the matrix (or length of an LED string)."""
         return self.__height
 
+    @property
+    def getCanvas(self):
+        """
+        Returns the LEDs as a (height, width, 4) numpy array of (red, green, blue, brightness) indexed by ``[y, x]``,
+        whatever order the LEDs are wired in. On RGBW LEDs there is a fifth value, white. The array is a view of the
+        LEDs, so changes made to it are shown the next time :class:`showLEDs()` is called. Call
+        :class:`releaseLEDs()` once it is no longer needed.
+        """
+        self.__settle()
+        self.__exposePixels()
+        return self.__canvas
+
+    @property
+    def colourCorrection(self):
+        """
+        Returns or sets the :class:`ColourCorrection` applied to the colours when the LEDs are shown.
+
+        :getter: Returns the correction.
+        :setter: Sets the correction.
+        :type: ColourCorrection
+        """
+        return self.__correction
+
+    @colourCorrection.setter
+    def colourCorrection(self, correction):
+        """
+        The setter for colourCorrection property.
+        """
+        self.__correction = correction
+        self.__scaletable = self.__scaleTable(correction)
+        if self.__dither:
+            self.__finetable = self.__fineTable(correction)
+        self.__dirty[:] = True
+
+    @property
+    def getChannels(self):
+        """Returns how many values are held for each LED: 4 (red, green, blue, brightness), or 5 with white."""
+        return self.__channels
+
+    @property
+    def extractWhite(self):
+        """
+        Returns or sets whether the white shared by the red, green and blue of each LED is moved onto the white LED
+        of RGBW LEDs when shown.
+
+        :getter: Returns whether white is extracted.
+        :setter: Sets whether white is extracted.
+        :type: bool
+        """
+        return self.__extractwhite
+
+    @extractWhite.setter
+    def extractWhite(self, extractwhite):
+        """
+        The setter for extractWhite property.
+        """
+        self.__extractwhite = bool(extractwhite)
+        self.__dirty[:] = True
+
+    @property
+    def dither(self):
+        """
+        Returns or sets whether the colours are temporally dithered.
+
+        Each colour, once corrected and scaled by its LED's brightness, is worked out to a fraction of a step
+        rather than rounded, and each LED is rounded up on that fraction of the frames in a cycle of
+        ``len(ditherlevels)`` frames. At low brightness, where only a few steps are left, fades then change smoothly
+        instead of stepping. As the LEDs must be sent every frame to dither, :class:`showLEDs()` sends a frame each
+        time it is called while any LED has a fraction, even if no LED has changed, so call it at a steady rate (for
+        example from a :class:`FrameScheduler`).
+
+        :getter: Returns whether the colours are dithered.
+        :setter: Sets whether the colours are dithered.
+        :type: bool
+        """
+        return self.__dither
+
+    @dither.setter
+    def dither(self, dither):
+        """
+        The setter for dither property.
+        """
+        dither = bool(dither)
+
+        if dither and self.__dithertable is None:
+            levels = (np.array(self.ditherlevels, dtype=np.uint16) * 256 + 128) // len(self.ditherlevels)
+            frames = np.arange(len(levels)).reshape(-1, 1, 1)
+            offsets = np.random.default_rng(self.__stripnum).integers(0, len(levels), (self.__striplength, 4))
+            self.__dithertable = levels[(frames + offsets) % len(levels)]
+            self.__fineframe = np.zeros((self.__striplength, 4), dtype=np.uint16)
+            self.__ditherwide = np.zeros((self.__striplength, 4), dtype=np.uint16)
+
+        self.__finetable = self.__fineTable(self.__correction) if dither else None
+        self.__dither = dither
+        self.__dithering = False
+        self.__dirty[:] = True
+
+    @property
+    def maxCurrent(self):
+        """
+        Returns or sets the most current (in milliamps) the LEDs on the terminal may draw, or None for no limit.
+
+        :getter: Returns the limit.
+        :setter: Sets the limit.
+        :type: float or None
+        """
+        return self.__maxcurrent
+
+    @maxCurrent.setter
+    def maxCurrent(self, maxcurrent):
+        """
+        The setter for maxCurrent property.
+        """
+        self.__maxcurrent = self.__checkCurrent(maxcurrent)
+        self.__dirty[:] = True
+
+    @property
+    def powerScale(self):
+        """
+        Returns or sets how much every LED is dimmed by (0.0-1.0) when shown, on top of :class:`maxCurrent`. Set
+        by a :class:`StripGroup` to keep the whole board within its current budget.
+
+        :getter: Returns the scale.
+        :setter: Sets the scale.
+        :type: float
+        """
+        return self.__powerscale
+
+    @powerScale.setter
+    def powerScale(self, scale):
+        """
+        The setter for powerScale property.
+        """
+        if not 0.0 <= scale <= 1.0:
+            raise ValueError('The power scale must be between 0.0 and 1.0.')
+
+        if scale != self.__powerscale:
+            self.__powerscale = float(scale)
+            self.__dirty[:] = True
+
+    @property
+    def getCurrent(self):
+        """Returns the estimated current (in milliamps) drawn by the last frame shown, after any power limit."""
+        return self.__current
+
+    @property
+    def getStats(self):
+        """
+        Returns a dictionary of how much work :class:`showLEDs()` has done and skipped:
+
+            * ``framesshown`` - frames sent to the LEDs
+            * ``framesskipped`` - frames not sent because no LED had changed
+            * ``framesdropped`` - frames replaced by a newer frame before the output thread could send them
+            * ``pixelsencoded`` - LEDs re-encoded because they had changed
+            * ``pixelsskipped`` - LEDs left as they were because they had not changed
+            * ``latencylast`` - seconds from the last frame being swapped to it being sent (threaded mode only)
+            * ``latencymax`` - the longest latency seen
+            * ``latencytotal`` - the total latency, so the average is ``latencytotal / framesshown``
+            * ``encodetime`` - the total seconds spent encoding the LED colours
+            * ``showtime`` - the total seconds spent sending the LED colours to the LEDs
+            * ``powerlimited`` - frames dimmed to keep within the power limit
+            * ``framesdithered`` - frames sent when no LED had changed, to move the :class:`dither` on
+        """
+        return dict(self.__stats)
+
+    def resetStats(self):
+        """Sets all of the :class:`getStats` counters back to 0."""
+        self.__stats = dict.fromkeys(self.statslist, 0)
+
     @property
     def getStripType(self):
         """Returns the set LED type."""
@@ -222,17 +564,14 @@ class Strip:
         :setter: Sets the status.
         :type: bool
         """
-        return self.__statuspin.value == 1
+        return self.__backend.status
 
     @updateStatus.setter
     def updateStatus(self, status=True):
         """
         The setter for updateStatus property.
         """
-        if status:
-            self.__statuspin.on()
-        else:
-            self.__statuspin.off()
+        self.__backend.status = status
 
     def __checkBrightness(self, brightness):
         """
@@ -245,36 +584,117 @@ class Strip:
         if brightness is None:
             brightness = self.__brightness
         else:
-            if 0 < brightness > 255:
+            if not 0 <= brightness <= 255:
                 raise ValueError('Brightness must be between 0 and 255')
 
         return brightness
 
     @staticmethod
-    def __checkRGB(rgb):
-        """Checks whether the rgb value passed in is valid."""
+    def __checkCurrent(maxcurrent):
+        """Checks whether the current limit is more than 0 (or None)."""
+        if maxcurrent is not None and maxcurrent <= 0:
+            raise ValueError('The maximum current must be more than 0.')
+
+        return maxcurrent
+
+    def __checkRGB(self, rgb):
+        """
+        Checks whether the rgb value passed in is valid. RGBW LEDs may also be given (r, g, b, w).
+
+        :return: (red, green, blue, white), with white 0 if it was not given
+        """
         if type(rgb) is not tuple:
             raise ValueError('The rgb value must be a tuple of the form (r, g, b).')
+        elif len(rgb) == 4 and self.__channels == 5:
+            red, green, blue, white = [int(c) & 0xff for c in rgb]
         elif len(rgb) != 3:
-            raise ValueError('The rgb tuple must have three elements (r, g, b).')
+            raise ValueError('The rgb tuple must have three elements (r, g, b), or four (r, g, b, w) for RGBW LEDs.')
+        else:
+            red, green, blue = [int(c) & 0xff for c in rgb]
+            white = 0
 
-        red, green, blue = [int(c) & 0xff for c in rgb]
+        return red, green, blue, white
 
-        return red, green, blue
+    @classmethod
+    def layoutColumns(cls, layout, channels):
+        """
+        Checks whether a layout is one of :data:`patternlayouts` that LEDs with ``channels`` values each can hold,
+        and returns where its values go in their pixel array.
 
-    @staticmethod
-    def __checkPattern(pattern):
+        :type layout: str
+        :param layout: The layout.
+
+        :type channels: int
+        :param channels: The number of values held for each LED (see :class:`getChannels`).
+
+        :return: The columns of the pixel array that the values of the layout go in, as a slice where possible, and
+            how many values there are
         """
-        Checks whether the pattern passed in is valid
+        layout = layout.upper()
+        if layout not in cls.patternlayouts:
+            raise ValueError('The pattern layout must be one of {}.'.format(', '.join(cls.patternlayouts)))
 
-        :param pattern: A list of the RGB and brightness values of each led in the terminal
+        columns = cls.patternlayouts[layout]
+        if columns[-1] >= channels:
+            raise ValueError('The pattern layout has a white value, but the LEDs are not RGBW.')
+
+        if columns == list(range(len(columns))):
+            return slice(0, len(columns)), len(columns)
+
+        return columns, len(columns)
+
+    def __checkLayout(self, layout):
+        """
+        Checks whether the pattern layout is one of :data:`patternlayouts` that these LEDs can hold.
+
+        :type layout: str or None
+        :param layout: The layout, or None for the one :class:`getLEDs()` returns
+        :return: See :class:`layoutColumns()`
+        """
+        if layout is None:
+            layout = "RGB_BRIGHTNESS_W" if self.__channels == 5 else "RGB_BRIGHTNESS"
+
+        return self.layoutColumns(layout, self.__channels)
+
+    def __checkPattern(self, pattern, layout=None):
         """
+        Checks whether the pattern passed in is valid, turning a buffer into an array without copying it.
+
+        :param pattern: A list, array or bytes-like buffer of the values of each led in the terminal
+        :param layout: The layout of the values, or None to work it out from the shape of a list or array
+        :return: The pattern as an (N, values) array, and the columns of the pixel array the values go in
+        """
+        if isinstance(pattern, (bytes, bytearray, memoryview)):
+            columns, width = self.__checkLayout(layout)
+            pattern = np.frombuffer(pattern, dtype=np.uint8)
+
+            if len(pattern) % width != 0:
+                raise ValueError("The pattern buffer must hold {} values for each LED".format(width))
+
+            pattern = pattern.reshape(-1, width)
+        else:
+            pattern = np.asarray(pattern)
+
+            # A canvas shaped (height, width, values) array is taken row by row
+            if pattern.ndim == 3:
+                pattern = pattern.reshape(-1, pattern.shape[2])
+
+            if pattern.ndim != 2:
+                raise ValueError("The pattern must be a list of the values of each LED")
+
+            # Without a layout, the number of values of each LED says which it is
+            if layout is None:
+                layout = {3: "RGB", 4: "RGB_BRIGHTNESS", 5: "RGB_BRIGHTNESS_W"}.get(pattern.shape[1])
+            columns, width = self.__checkLayout(layout)
+
+            if pattern.shape[1] != width:
+                raise ValueError("Each index of the pattern must have four elements (red, green, blue, brightness), "
+                                 "or as many as its layout has")
+
         if len(pattern) == 0:
             raise ValueError("The pattern must have elements")
-        if len(pattern[0]) != 4:
-            raise ValueError("Each index of the pattern must have four elements (red, green, blue, brightness)")
 
-        return pattern
+        return pattern, columns
 
     def __setBrightness(self, brightness, led=None):
         """
@@ -289,30 +709,31 @@ class Strip:
         brightness = self.__checkBrightness(brightness)
 
         if led is None:
-            for led in range(self.__striplength):
-                self.__pixels[led][3] = brightness
+            self.__pixels[:, 3] = brightness
+            self.__dirty[:] = True
         else:
             pixelnumber = self.__translate(led)
 
-            if 0 <= pixelnumber < self.__striplength:
+            if not 0 <= pixelnumber < self.__striplength:
                 raise ValueError('The led index is out of range.')
 
-            self.__pixels[led][3] = brightness
+            self.__pixels[pixelnumber, 3] = brightness
+            self.__dirty[pixelnumber] = True
 
     def __setImage(self, image, position=None):
         """
-        Plots an RGB image to the matrix or string of LEDs.
+        Plots an RGB or RGBA image to the matrix or string of LEDs in one array operation. Any part of the image
+        outside the LEDs is clipped, and an RGBA image is blended with the LEDs using its alpha channel.
 
-        :type image: RGB Format image
-        :param image: An image in RGB format (see PILLOW library)
+        :type image: RGB or RGBA Format image
+        :param image: An image in RGB or RGBA format (see PILLOW library)
 
         :type position: int, tuple or None
-        :param position: The location on the matrix
+        :param position: The location on the matrix of the top left of the image, or the LED on a string that the
+            first row of the image starts at
         """
-        if image.mode != 'RGB':
-            raise ValueError("The image must be in RGB format.")
-
-        imagewidth, imageheight = image.size
+        if image.mode not in ('RGB', 'RGBA'):
+            raise ValueError("The image must be in RGB or RGBA format.")
 
         if self.__stripshape in self.matrixshapelist:
             if position is None:
@@ -323,84 +744,181 @@ class Strip:
                 raise ValueError(
                     'A matrix shape has been defined, but the start position does not have two elements (i.e. (x, y)).')
             px, py = position
-            width = min(imagewidth, self.__width)
-            height = min(imageheight, self.__height)
         else:
             if position is None:
                 position = 0
             if type(position) is tuple:
                 raise ValueError('A non-matrix shape has been defined, but the size is a tuple.')
-            px, py = position, 0
-            width = 1
-            height = min(imageheight, self.__height)
+            px, py = 0, position
+
+        imagecolours = np.asarray(image)
+        imageheight, imagewidth = imagecolours.shape[0:2]
 
-        imagecolours = list(image.getdata())
+        # ------------------------------------------------------------------
+        # Clip the image to the part that lands on the LEDs
+        # ------------------------------------------------------------------
+        left, top = max(px, 0), max(py, 0)
+        right, bottom = min(px + imagewidth, self.__width), min(py + imageheight, self.__height)
 
-        for y in range(height):
-            for x in range(width):
-                r, g, b = imagecolours[x + y * 8]
-                self.setLEDs(led=(px + x, py + y), rgb=(r, g, b))
+        if left >= right or top >= bottom:
+            return
 
-    def __setPattern(self, pattern):
+        source = imagecolours[top - py:bottom - py, left - px:right - px]
+        rows = ((np.arange(top, bottom) + self.__yoffset) % self.__height)[:, np.newaxis]
+        columns = (np.arange(left, right) + self.__xoffset) % self.__width
+
+        if image.mode == 'RGBA':
+            alpha = source[:, :, 3:4].astype(np.uint16)
+            target = self.__canvas[rows, columns, 0:3]
+            self.__canvas[rows, columns, 0:3] = (source[:, :, 0:3] * alpha + target * (255 - alpha) + 127) // 255
+        else:
+            self.__canvas[rows, columns, 0:3] = source
+
+        self.__dirty.reshape(self.__height, self.__width)[rows, columns] = True
+
+    def __setPattern(self, pattern, layout=None):
         """
-        Sets the RGB and brightness of the LEDs using the pattern passed in
+        Sets the values of the LEDs using the pattern passed in, in one copy
 
-        :param pattern:
+        :param pattern: A list, array or bytes-like buffer of the values of each LED
+        :param layout: One of :data:`patternlayouts`, or None for the default
         """
-        pattern = self.__checkPattern(pattern)
+        pattern, columns = self.__checkPattern(pattern, layout)
+        length = min(self.__striplength, len(pattern))
 
-        for pixelnumber in range(min(self.__striplength, len(pattern))):
-            self.__pixels[pixelnumber] = pattern[pixelnumber]
+        self.__settle()
 
-    def __translate(self, pixel):
-        """Translates co-ordinates for various different shapes"""
-
-        realpixel = -1
-        if self.__stripshape == "straight" or type(pixel) is not tuple:
-            if 0 <= pixel < self.__striplength:
-                realpixel = pixel
-        elif self.__stripshape == "reverse":
-            if 0 <= pixel < self.__striplength:
-                realpixel = self.__striplength - pixel
+        # Only the LEDs the pattern changes need sending again
+        pattern = pattern[:length]
+        self.__dirty[:length] |= (self.__pixels[:length, columns] != pattern).any(axis=1)
+        self.__pixels[:length, columns] = pattern
+
+    def __buildMap(self):
+        """
+        Builds the lookup tables between the logical LED positions and the order the LEDs are wired in.
+
+        :return: A (height, width) array of the strip index of each (x, y) position, and an (N,) array of the
+            logical index (``x + y * width``) of each LED along the strip
+        """
+        physical = np.arange(self.__striplength).reshape(self.__height, self.__width)
+
+        if self.__stripshape == "reverse":
+            physical = physical[::-1].copy()
         elif self.__stripshape == "zmatrix":
+            physical[1::2] = physical[1::2, ::-1].copy()
+
+        logical = np.empty(self.__striplength, dtype=np.intp)
+        logical[physical.ravel()] = np.arange(self.__striplength)
+
+        return physical, logical
+
+    def __translate(self, pixel):
+        """
+        Translates an LED location into its index in the pixel array, allowing for the viewport.
+
+        An (x, y) location is used as is. An LED count on a string is counted from the start of the string, and on a
+        matrix it is counted along the wiring from the first LED.
+
+        :return: The index, or -1 if the location is out of range
+        """
+        if type(pixel) is tuple:
             x, y = pixel
-            if 0 <= x < self.__width and 0 <= y <= self.__height:
-                if y % 2 == 0:
-                    realpixel = (y * self.__width) + x
-                else:
-                    realpixel = ((y + 1) * self.__width) - (x + 1)
-        elif self.__stripshape == "matrix":
-            x, y = pixel
-            if 0 <= x < self.__width and 0 <= y <= self.__height:
-                realpixel = y * self.__width + x
-        return realpixel
+            if not (0 <= x < self.__width and 0 <= y < self.__height):
+                return -1
+        elif 0 <= pixel < self.__striplength:
+            if self.__stripshape in self.matrixshapelist:
+                pixel = int(self.__logical[pixel])
+            y, x = divmod(pixel, self.__width)
+        else:
+            return -1
+
+        return ((y + self.__yoffset) % self.__height) * self.__width + (x + self.__xoffset) % self.__width
+
+    def __settle(self):
+        """
+        Moves the pixels so that the viewport starts at the start of the canvas again. Used before the canvas is
+        worked on or handed out as a whole.
+        """
+        if self.__yoffset == 0 and self.__xoffset == 0:
+            return
+
+        offset = (-self.__yoffset, -self.__xoffset)
+        self.__canvas[:] = np.roll(self.__canvas, offset, axis=(0, 1))
+        self.__dirty[:] = np.roll(self.__dirty.reshape(self.__height, self.__width), offset, axis=(0, 1)).ravel()
+        if self.__shown is not None:
+            self.__shown[:] = np.roll(self.__shown.reshape(self.__height, self.__width, self.__channels), offset,
+                                      axis=(0, 1)).reshape(self.__striplength, self.__channels)
+
+        self.__yoffset = 0
+        self.__xoffset = 0
+        self.__wiring = None
+
+    def __wiringTable(self):
+        """Returns the strip index of each entry in the pixel array, allowing for the viewport."""
+        if self.__wiring is None:
+            self.__wiring = np.roll(self.__physical, (self.__yoffset, self.__xoffset), axis=(0, 1)).ravel()
 
-    def getLEDs(self, led=None):
+        return self.__wiring
+
+    def getLEDs(self, led=None, export=None, layout=None):
         """
         If ``led`` is supplied, returns the RGB and brightness values of a specific LED.
 
-        If led is not supplied or set to ``None`` a list of red, green, blue and brightness values for each LED
-        is returned in a list.
+        If led is not supplied or set to ``None`` the red, green, blue and brightness values for each LED
+        are returned as an ``(N, 4)`` numpy array, from the start of a string or row by row for a matrix. The array
+        is a view of the LEDs, so changes made to it are shown the next time :class:`showLEDs()` is called. Call
+        :class:`releaseLEDs()` once it is no longer needed.
+
+        On RGBW LEDs each LED also has its white value, after the brightness.
+
+        To keep the LEDs as they are now without the array following later changes, ``export`` all of them as a
+        ``SNAPSHOT`` (a read-only copy of the array) or as ``BYTES`` ready to save or send, optionally in another
+        ``layout`` that :class:`setLEDs()` can load them back from.
 
         :type led: int, tuple or None
         :param led: The led location, either the LED count from the start, or the x,y matrix location,
-            or if None, a list of all LEDs will be returned
-        :return: (red, green, blue, brightness) or a list of (red, green, blue, brightness)
+            or if None, an array of all LEDs will be returned
+
+        :type export: str or None
+        :param export: ``SNAPSHOT``, ``BYTES`` or None for the array of the LEDs themselves.
+
+        :type layout: str or None
+        :param layout: The layout of an export, one of :data:`patternlayouts`, or None for all of the values.
+
+        :return: (red, green, blue, brightness[, white]), an array of (red, green, blue, brightness[, white]) or the
+            export
         """
 
         if led is None:
-            return self.__pixels
+            self.__settle()
+
+            if export is None:
+                if layout is not None:
+                    raise ValueError('A layout can only be given for an export.')
+                self.__exposePixels()
+                return self.__pixels
+
+            export = export.upper()
+            if export not in self.exportlist:
+                raise ValueError('The export must be either SNAPSHOT or BYTES.')
+
+            columns, _ = self.__checkLayout(layout)
+
+            if export == "BYTES":
+                return self.__pixels[:, columns].tobytes()
+
+            snapshot = np.array(self.__pixels[:, columns])
+            snapshot.flags.writeable = False
+            return snapshot
         else:
             pixelnumber = self.__translate(led)
 
             if 0 <= pixelnumber < self.__striplength:
-                r, g, b, brightness = self.__pixels[pixelnumber]
+                return tuple(int(c) for c in self.__pixels[pixelnumber])
             else:
-                r, g, b, brightness = [0, 0, 0, 0]
+                return (0,) * self.__channels
 
-            return r, g, b, brightness
-
-    def setLEDs(self, led=None, rgb=None, brightness=None, image=None, pattern=None):
+    def setLEDs(self, led=None, rgb=None, brightness=None, image=None, pattern=None, layout=None):
         """
         Sets the RGB value, and optionally brightness, of one or more LEDs.
 
@@ -413,59 +931,99 @@ class Strip:
         If a brightness value is not supplied, or set to ``None``, the current LED brightness
         will be kept.
 
-        If an image is supplied, then it must be in RGB format (see
-        `Pillow image file formats <https://pillow.readthedocs.io/en/stable/handbook/image-file-formats.html>`_)
+        If an image is supplied, then it must be in RGB or RGBA format (see
+        `Pillow image file formats <https://pillow.readthedocs.io/en/stable/handbook/image-file-formats.html>`_).
+        It is drawn with its top left corner at ``led`` (which defaults to the first LED), and any part of it that
+        does not fit on the LEDs is clipped. An RGBA image is blended with the LEDs using its alpha channel.
 
         If a pattern is supplied, it must be a list consisting of a tuple with four elements,
-        ``(red, green, blue, brightness)``.
+        ``(red, green, blue, brightness)``, or an ``(N, 4)`` numpy array such as the one returned by
+        :class:`getLEDs()`.
+
+        A pattern can also be a ``bytes``, ``bytearray`` or ``memoryview`` buffer of one byte per value, or a numpy
+        array, which are loaded in a single copy. ``layout`` says which values each LED has: ``RGB``, ``RGBW``,
+        ``RGB_BRIGHTNESS`` or ``RGB_BRIGHTNESS_W`` (see :data:`patternlayouts`). Values not in the layout are left as
+        they are. Without a layout, a buffer has the same layout as :class:`getLEDs()`, and an array of 3 values per
+        LED is ``RGB``.
+
+        On RGBW LEDs, ``rgb`` may be ``(red, green, blue, white)`` (an RGB colour sets white to 0), and each entry of
+        a pattern may have a fifth element, white.
 
         :type led: int, tuple or None
         :param led: The LED location or None to set all LEDs to the desired colour.
 
         :type rgb: tuple or None
-        :param rgb: A tuple consisting of 3 elements, (red, green, blue), with each value being between 0 and 255.
+        :param rgb: A tuple consisting of 3 elements, (red, green, blue), with each value being between 0 and 255, or
+            4 elements, (red, green, blue, white), on RGBW LEDs.
 
         :type brightness: int or None
         :param brightness: A value between 0 (dim) to 255 (very bright) or None to take the default.
 
         :type image: image or None
-        :param image: An image callingclass (see PIL or Pillow libraries) containing an RGB formatted image.
+        :param image: An image callingclass (see PIL or Pillow libraries) containing an RGB or RGBA formatted image.
 
-        :type pattern: list or None
+        :type pattern: list, numpy.ndarray, bytes-like or None
         :param pattern: A list of the RGB and brightness values for each LED, in numerical order from the start of the
-            strip/matrix.
+            string, or row by row for a matrix (the same order as :class:`getLEDs()`).
+
+        :type layout: str or None
+        :param layout: The layout of the values of each LED in the pattern. If None, a list or array with 3, 4 or 5
+            values for each LED is taken as ``RGB``, ``RGB_BRIGHTNESS`` or ``RGB_BRIGHTNESS_W``, and a buffer as all of
+            the values :class:`getLEDs()` returns.
         """
 
         if image is not None:
             self.__setImage(image, position=led)
         elif pattern is not None:
-            self.__setPattern(pattern)
+            self.__setPattern(pattern, layout)
         elif led is None and rgb is None and brightness is None:
             self.clearLEDs()
         else:
             if rgb is None:
                 self.__setBrightness(brightness, led)
             else:
-                red, green, blue = self.__checkRGB(rgb)
+                red, green, blue, white = self.__checkRGB(rgb)
 
                 if led is None:
                     brightness = self.__checkBrightness(brightness)
-                    self.__pixels = [[red, green, blue, brightness]] * self.__striplength
+                    self.__pixels[:] = (red, green, blue, brightness, white)[:self.__channels]
+                    self.__dirty[:] = True
                 else:
                     pixelnumber = self.__translate(led)
 
                     if 0 <= pixelnumber < self.__striplength:
-                        if brightness is None:
-                            brightness = self.__pixels[pixelnumber][3]
+                        self.__pixels[pixelnumber, 0:3] = (red, green, blue)
+                        self.__pixels[pixelnumber, 4:] = white
 
-                        self.__pixels[pixelnumber] = [red, green, blue, brightness]
+                        if brightness is not None:
+                            self.__pixels[pixelnumber, 3] = self.__checkBrightness(brightness)
+
+                        self.__dirty[pixelnumber] = True
 
     def clearLEDs(self):
         """
         Clears the LEDs (sets them to black), leaving the brightness as it is.
         """
-        for pixel in range(self.__striplength):
-            self.__pixels[pixel][0:3] = [0, 0, 0]
+        self.__dirty |= self.__pixels[:, 0:3].any(axis=1)
+        self.__pixels[:, 0:3] = 0
+
+        if self.__channels == 5:
+            self.__dirty |= self.__pixels[:, 4] > 0
+            self.__pixels[:, 4] = 0
+
+    def releaseLEDs(self):
+        """
+        Tells the Strip that the arrays handed out by :class:`getCanvas` and :class:`getLEDs()`, and any views of
+        them, will not be used again. Changes already made through them are still shown by the next
+        :class:`showLEDs()`. Until then, every :class:`showLEDs()` compares all of the LEDs with those last shown,
+        and :class:`shift()` has to move the pixels; afterwards only the LEDs changed by the Strip's own methods are
+        sent again, and shifts are free. Get the array again before changing the LEDs through it.
+        """
+        if self.__shown is None:
+            return
+
+        self.__dirty |= (self.__pixels != self.__shown).any(axis=1)
+        self.__shown = None
 
     def shift(self, direction="UP", shift=1):
         """
@@ -476,6 +1034,10 @@ class Strip:
 
         :type shift: int
         :param shift: The number of LEDs the matrix/string should be moved in the specified direction.
+
+        The LEDs are shifted without moving them in memory, however large the matrix. Once the array of the LEDs
+        has been handed out by :class:`getCanvas` or :class:`getLEDs()` it must stay in (x, y) order, so the pixels
+        are moved instead until :class:`releaseLEDs()` is called.
         """
         direction = direction.upper()
         if direction not in self.rotatelist:
@@ -485,14 +1047,10 @@ class Strip:
             if self.__striplength < shift or shift <= 0:
                 raise ValueError('The shift value must be positive and shorter than the string length.')
 
-            if direction == "LEFT" or direction == "UP":
-                for _ in range(shift):
-                    self.__pixels.insert(0, self.__pixels[self.__striplength - 1])
-                    self.__pixels.pop(self.__striplength)
-            else:
-                for _ in range(shift):
-                    self.__pixels.append(self.__pixels[0])
-                    self.__pixels.pop(0)
+            if direction == "RIGHT" or direction == "DOWN":
+                shift = -shift
+
+            dy, dx = shift, 0
         else:
             if direction == "UP" or direction == "DOWN":
                 if shift >= self.__height:
@@ -501,12 +1059,7 @@ class Strip:
                 if direction == "DOWN":
                     shift = -shift
 
-                tempstrip = self.__pixels.copy()
-
-                for y in range(self.__height):
-                    newy = (y + shift) % self.__height
-                    for x in range(self.__width):
-                        self.__pixels[self.__translate((x, newy))] = tempstrip[self.__translate((x, y))]
+                dy, dx = shift, 0
             else:
                 if shift >= self.__width:
                     raise ValueError('The shift must be smaller than the width of the matrix.')
@@ -514,12 +1067,20 @@ class Strip:
                 if direction == "LEFT":
                     shift = -shift
 
-                tempstrip = self.__pixels.copy()
+                dy, dx = 0, shift
+
+        # ------------------------------------------------------------------
+        # Move the viewport rather than the pixels, unless the canvas has
+        # been handed out and must stay in (x, y) order
+        # ------------------------------------------------------------------
+        if self.__shown is None:
+            self.__yoffset = (self.__yoffset - dy) % self.__height
+            self.__xoffset = (self.__xoffset - dx) % self.__width
+            self.__wiring = None
+        else:
+            self.__canvas[:] = np.roll(self.__canvas, (dy, dx), axis=(0, 1))
 
-                for x in range(self.__width):
-                    newx = (x + shift) % self.__width
-                    for y in range(self.__height):
-                        self.__pixels[self.__translate((newx, y))] = tempstrip[self.__translate((x, y))]
+        self.__dirty[:] = True
 
     def mirror(self, mirror="VERTICAL"):
         """
@@ -530,6 +1091,7 @@ class Strip:
         :type mirror: str
         :param mirror: :data:`VERTICAL` *(default)* or :data:`HORIZONTAL`
         """
+        self.__settle()
 
         if self.__stripshape in self.matrixshapelist:
             mirror = mirror.upper()
@@ -537,30 +1099,326 @@ class Strip:
             if mirror not in self.mirrorlist:
                 raise ValueError('The mirror value must be either VERTICAL or HORIZONTAL.')
 
-            tempstrip = self.__pixels.copy()
-
             if mirror == "VERTICAL":
-                for y in range(int(self.__height / 2)):
-                    for x in range(self.__width):
-                        self.__pixels[self.__translate((x, y))] = tempstrip[
-                            self.__translate((x, self.__height - 1 - y))]
-                        self.__pixels[self.__translate((x, self.__height - 1 - y))] = tempstrip[
-                            self.__translate((x, y))]
+                self.__canvas[:] = self.__canvas[::-1].copy()
             else:
-                for x in range(int(self.__width / 2)):
-                    for y in range(self.__height):
-                        self.__pixels[self.__translate((x, y))] = tempstrip[
-                            self.__translate((self.__width - 1 - x, y))]
-                        self.__pixels[self.__translate((self.__width - 1 - x, y))] = tempstrip[
-                            self.__translate((x, y))]
+                self.__canvas[:] = self.__canvas[:, ::-1].copy()
         else:
-            self.__pixels.reverse()
+            self.__pixels[:] = self.__pixels[::-1].copy()
+
+        self.__dirty[:] = True
+
+    def rotate(self, angle=90):
+        """
+        Rotates the matrix LEDs clockwise by :data:`angle` degrees.
+
+        Only square matrices can be rotated by 90 or 270 degrees. Rotating an LED string by 180 degrees reverses it.
+
+        :type angle: int
+        :param angle: 90 *(default)*, 180 or 270
+        """
+        if angle not in self.anglelist:
+            raise ValueError('The rotation angle must be one of 90, 180 or 270.')
+        if angle != 180 and self.__width != self.__height:
+            raise ValueError('Only a square matrix can be rotated by 90 or 270 degrees.')
+
+        self.__settle()
+        self.__canvas[:] = np.rot90(self.__canvas, k=-angle // 90, axes=(0, 1)).copy()
+        self.__dirty[:] = True
+
+    def transpose(self):
+        """
+        Swaps the rows and columns of a square matrix, so the LED at (x, y) moves to (y, x).
+        """
+        if self.__width != self.__height:
+            raise ValueError('Only a square matrix can be transposed.')
+
+        self.__settle()
+        self.__canvas[:] = self.__canvas.transpose(1, 0, 2).copy()
+        self.__dirty[:] = True
+
+    @classmethod
+    def __scaleTable(cls, correction):
+        """
+        Returns the 4 x 256 x 256 table of each corrected red, green, blue and white value scaled by each
+        brightness. Tables are built once and shared between Strips with the same correction.
+
+        :type correction: ColourCorrection
+        :param correction: The colour correction
+        """
+        table = cls.__scaletables.get(correction.key)
+
+        if table is None:
+            brightness = np.arange(256).reshape(1, 256, 1) / 255.0
+            curves = np.concatenate([correction.curves, correction.whiteCurve.reshape(1, 256)])
+            table = np.rint(curves.reshape(4, 1, 256) * brightness).astype(np.uint8)
+            cls.__scaletables[correction.key] = table
+
+        return table
+
+    @classmethod
+    def __fineTable(cls, correction):
+        """
+        Returns the same table as :class:`__scaleTable()` in 8.8 fixed point (the value times 256), kept to a fraction
+        of a step for dithering.
+
+        :type correction: ColourCorrection
+        :param correction: The colour correction
+        """
+        table = cls.__finetables.get(correction.key)
+
+        if table is None:
+            brightness = np.arange(256).reshape(1, 256, 1) / 255.0
+            curves = np.concatenate([correction.curves, correction.whiteCurve.reshape(1, 256)])
+            table = np.minimum(np.rint(curves.reshape(4, 1, 256) * brightness * 256), 255 * 256).astype(np.uint16)
+            cls.__finetables[correction.key] = table
+
+        return table
+
+    def __exposePixels(self):
+        """
+        Called when the pixel array is handed out. As it may then be changed without the Strip knowing, from now on
+        (until :class:`releaseLEDs()`) :class:`showLEDs()` also compares the pixels with those last shown.
+        """
+        if self.__shown is None:
+            self.__shown = self.__pixels.copy()
+
+    def __changedPixels(self):
+        """Returns the logical indexes of the LEDs that have changed since the last :class:`showLEDs()`."""
+        dirty = self.__dirty
+
+        if self.__shown is not None:
+            dirty = dirty | (self.__pixels != self.__shown).any(axis=1)
+
+        return np.flatnonzero(dirty)
+
+    def __encodeFrame(self, pixels, changed, wiring):
+        """
+        Packs the changed pixels into the colour words sent to the LEDs, reordering them into wiring order.
+
+        The words are little-endian, so each LED's bytes are blue, green, red and white. Each colour is scaled by
+        the LED's brightness and corrected through the scale table. On RGBW LEDs the white is packed in the same
+        pass, after any shared white has been moved onto it.
+
+        When dithering, the pixels are encoded to the fixed point frame instead, and the whole frame is then
+        dithered into the colour words.
+
+        :param pixels: The (N, channels) pixel array to encode from
+        :param changed: The indexes in the pixel array of the LEDs to encode
+        :param wiring: The strip index of each entry in the pixel array
+        :return: The wiring order indexes of the encoded LEDs
+        """
+        wired = wiring[changed]
+        pixels = pixels[changed]
+        brightness = pixels[:, 3:4]
+
+        if self.__dither:
+            frame, table = self.__fineframe, self.__finetable
+        else:
+            frame, table = self.__wordbytes, self.__scaletable
+
+        if self.__channels == 4:
+            frame[wired, 0:3] = table[self.__bgr, brightness, pixels[:, 2::-1]]
+        else:
+            colours = pixels[:, 2::-1]
+            white = pixels[:, 4]
+
+            if self.__extractwhite:
+                colours = rgbToRGBW(colours)
+                white = np.minimum(colours[:, 3] + white.astype(np.uint16), 255)
+                colours = colours[:, 0:3]
+
+            frame[wired, 0:3] = table[self.__bgr, brightness, colours]
+            frame[wired, 3] = table[3, brightness[:, 0], white]
+
+        if not self.__dither:
+            return wired
+
+        # ------------------------------------------------------------------
+        # Add this frame's thresholds and keep the whole steps, so each LED
+        # is rounded up on the fraction of the cycle given by its fraction
+        # ------------------------------------------------------------------
+        if len(wired) > 0:
+            self.__dithering = bool((self.__fineframe & 0xff).any())
+
+        np.add(self.__fineframe, self.__dithertable[self.__ditherphase], out=self.__ditherwide)
+        self.__ditherwide >>= 8
+        self.__wordbytes[:] = self.__ditherwide
+        self.__ditherphase = (self.__ditherphase + 1) % len(self.__dithertable)
+
+        return self.__allleds
+
+    def __limitPower(self, wired):
+        """
+        Estimates the current the encoded frame will draw and, if it is over :class:`maxCurrent` or
+        :class:`powerScale` is below 1, dims a copy of the whole frame to send instead.
+
+        :param wired: The wiring order indexes of the LEDs encoded for this frame
+        :return: The colour words to send, and the indexes of those that have changed
+        """
+        perchannel, idle = self.ledcurrents[self.__striptype]
+        idlecurrent = idle * self.__striplength
+        colourcurrent = int(self.__wordbytes.sum(dtype=np.uint64)) * perchannel / 255.0
+
+        scale = self.__powerscale
+        limit = self.__maxcurrent
+        if limit is not None and colourcurrent > 0 and idlecurrent + colourcurrent * scale > limit:
+            scale = max(limit - idlecurrent, 0.0) / colourcurrent
+
+        if scale >= 1.0:
+            self.__current = idlecurrent + colourcurrent
+
+            # The LEDs still hold a dimmed frame, so every word must be sent again
+            if self.__limited:
+                self.__limited = False
+                return self.__words, self.__allleds
+
+            return self.__words, wired
+
+        # ------------------------------------------------------------------
+        # Dim every colour by the same fraction (rounded down, so the frame
+        # is never over the limit)
+        # ------------------------------------------------------------------
+        keep = int(scale * 256)
+        self.__limitwide[:] = self.__wordbytes
+        self.__limitwide *= keep
+        self.__limitwide >>= 8
+        self.__limitbytes[:] = self.__limitwide
+
+        self.__current = idlecurrent + colourcurrent * keep / 256.0
+        self.__limited = True
+        self.__stats["powerlimited"] += 1
+
+        return self.__limitwords, self.__allleds
 
     def showLEDs(self):
         """
         Once you have set the colours of the string/matrix LEDs, use :class:`showLEDs` to update the LEDs.
+
+        Only the LEDs that have changed since the last call are re-encoded, and if none have changed the LEDs are
+        not updated at all. See :class:`getStats`.
+
+        If the Strip is ``threaded``, this is the same as :class:`swapLEDs()`.
+        """
+        if self.__outputthread is not None:
+            self.swapLEDs()
+            return
+
+        changed = self.__changedPixels()
+
+        self.__stats["pixelsencoded"] += len(changed)
+        self.__stats["pixelsskipped"] += self.__striplength - len(changed)
+
+        if len(changed) == 0:
+            if not self.__dithering:
+                self.__stats["framesskipped"] += 1
+                return
+            self.__stats["framesdithered"] += 1
+
+        encodestart = time.perf_counter()
+        words, wired = self.__limitPower(self.__encodeFrame(self.__pixels, changed, self.__wiringTable()))
+        self.__backend.writeFrame(words, wired)
+        showstart = time.perf_counter()
+        self.__backend.show()
+        self.__stats["encodetime"] += showstart - encodestart
+        self.__stats["showtime"] += time.perf_counter() - showstart
+        self.__stats["framesshown"] += 1
+
+        if self.__shown is not None:
+            self.__shown[changed] = self.__pixels[changed]
+        self.__dirty[:] = False
+
+    def swapLEDs(self):
+        """
+        Hands the LED colours that have been set to the output thread of a ``threaded`` Strip and returns straight
+        away, so the next frame can be drawn while this one is sent to the LEDs.
+
+        If the output thread is still busy when the next frame is swapped, the waiting frame is replaced and counted
+        in ``framesdropped`` (see :class:`getStats`). A Strip which is not ``threaded`` shows the LEDs instead.
+        """
+        if self.__outputthread is None:
+            self.showLEDs()
+            return
+
+        changed = self.__changedPixels()
+
+        with self.__outputcondition:
+            self.__stats["pixelsencoded"] += len(changed)
+            self.__stats["pixelsskipped"] += self.__striplength - len(changed)
+
+            if len(changed) == 0:
+                if not self.__dithering:
+                    self.__stats["framesskipped"] += 1
+                    return
+                self.__stats["framesdithered"] += 1
+
+            if self.__frontwaiting:
+                self.__stats["framesdropped"] += 1
+
+            self.__front[changed] = self.__pixels[changed]
+            self.__frontdirty[changed] = True
+            self.__frontwiring = self.__wiringTable()
+            self.__frontwaiting = True
+            self.__swaptime = time.monotonic()
+            self.__outputcondition.notify()
+
+        if self.__shown is not None:
+            self.__shown[changed] = self.__pixels[changed]
+        self.__dirty[:] = False
+
+    def stopThread(self, timeout=None):
+        """
+        Sends any frame still waiting and stops the output thread of a ``threaded`` Strip. From then on
+        :class:`showLEDs()` updates the LEDs directly.
+
+        :type timeout: float or None
+        :param timeout: The most seconds to wait for the thread to stop, or None to wait until it has.
+
+        :return: Whether the output thread has stopped
         """
-        for pixel in range(self.__strip.numPixels()):
-            r, g, b, brightness = self.__pixels[pixel]
-            self.__strip.setPixelColorRGB(pixel, r, g, b)
-        self.__strip.show()
+        if self.__outputthread is None:
+            return True
+
+        with self.__outputcondition:
+            self.__outputrunning = False
+            self.__outputcondition.notify()
+
+        if self.__outputthread is not threading.current_thread():
+            self.__outputthread.join(timeout)
+            if self.__outputthread.is_alive():
+                return False
+
+        self.__outputthread = None
+        return True
+
+    def __outputLoop(self):
+        """The output thread of a ``threaded`` Strip: sends each frame swapped into the front buffer."""
+        while True:
+            with self.__outputcondition:
+                while not self.__frontwaiting and self.__outputrunning:
+                    self.__outputcondition.wait()
+
+                if not self.__frontwaiting:
+                    return
+
+                changed = np.flatnonzero(self.__frontdirty)
+                self.__frontdirty[:] = False
+                self.__frontwaiting = False
+                swaptime = self.__swaptime
+
+                encodestart = time.perf_counter()
+                words, wired = self.__limitPower(self.__encodeFrame(self.__front, changed, self.__frontwiring))
+                self.__backend.writeFrame(words, wired)
+
+            showstart = time.perf_counter()
+            self.__backend.show()
+            showend = time.perf_counter()
+            latency = time.monotonic() - swaptime
+
+            with self.__outputcondition:
+                self.__stats["encodetime"] += showstart - encodestart
+                self.__stats["showtime"] += showend - showstart
+                self.__stats["framesshown"] += 1
+                self.__stats["latencylast"] = latency
+                self.__stats["latencymax"] = max(self.__stats["latencymax"], latency)
+                self.__stats["latencytotal"] += latency
@@ -0,0 +1,297 @@
+"""
+.. module:: pixelpi
+   :platform: Unix
+   :synopsis: Control of several PixelPi terminals as one set of LEDs
+"""
+
+import numpy as np
+
+
+class StripCanvas:
+    """
+    The base of the classes that draw on one canvas shown on several :class:`Strip` objects, such as
+    :class:`StripGroup` and :class:`VirtualCanvas`. It holds the strips and the canvas and provides the methods for
+    drawing on them; each kind of canvas copies its canvas to its strips in its own way.
+
+    :type strips: list
+    :param strips: The :class:`Strip` objects, each on a different terminal.
+
+    :type canvas: numpy.ndarray
+    :param canvas: The (height, width, channels) canvas.
+    """
+
+    def __init__(self, strips, canvas):
+        self.__strips = list(strips)
+        self.__canvas = canvas
+        self.__height, self.__width, self.__channels = canvas.shape
+
+    @staticmethod
+    def checkStrips(strips):
+        """
+        Checks that there is at least one strip and that each is on a different terminal.
+
+        :type strips: list
+        :param strips: The :class:`Strip` objects.
+
+        :return: The most values any of the strips holds for each LED (4, or 5 if any is RGBW)
+        """
+        if len(strips) == 0:
+            raise ValueError('There must be at least one strip.')
+
+        terminals = [strip.getStripNumber for strip in strips]
+        if len(set(terminals)) != len(terminals):
+            raise ValueError('Each strip must be on a different terminal.')
+
+        return max(strip.getChannels for strip in strips)
+
+    @property
+    def getStrips(self):
+        """Returns the list of strips."""
+        return list(self.__strips)
+
+    @property
+    def getWidth(self):
+        """Returns the width of the canvas."""
+        return self.__width
+
+    @property
+    def getHeight(self):
+        """Returns the height of the canvas."""
+        return self.__height
+
+    @property
+    def getCanvas(self):
+        """
+        Returns the canvas as a (height, width, 4) numpy array indexed by ``[y, x]``, with a fifth value (white)
+        if any strip is RGBW. Changes made to it are shown the next time :class:`showLEDs()` is called.
+        """
+        return self.__canvas
+
+    @property
+    def getStats(self):
+        """
+        Returns the :class:`Strip.getStats` counters of all of the strips added together (apart from ``latencylast``
+        and ``latencymax``, which are the largest of the strips).
+        """
+        stats = {}
+        for strip in self.__strips:
+            for key, value in strip.getStats.items():
+                if key in ("latencylast", "latencymax"):
+                    stats[key] = max(stats.get(key, 0), value)
+                else:
+                    stats[key] = stats.get(key, 0) + value
+
+        return stats
+
+    def resetStats(self):
+        """Sets the counters of all of the strips back to 0."""
+        for strip in self.__strips:
+            strip.resetStats()
+
+    def __checkLED(self, led):
+        """Checks whether an (x, y) location is on the canvas."""
+        if type(led) is not tuple or len(led) != 2:
+            raise ValueError('The led location of a canvas must be a tuple of the form (x, y).')
+
+        x, y = led
+        if not (0 <= x < self.__width and 0 <= y < self.__height):
+            raise ValueError('The led location is outside the canvas.')
+
+        return x, y
+
+    def getLEDs(self, led=None):
+        """
+        If ``led`` is supplied, returns the RGB and brightness values of the LED at (x, y) on the canvas, otherwise
+        returns the canvas.
+
+        :type led: tuple or None
+        :param led: The (x, y) location or None
+        :return: (red, green, blue, brightness[, white]) or the canvas
+        """
+        if led is None:
+            return self.__canvas
+
+        x, y = self.__checkLED(led)
+
+        return tuple(int(c) for c in self.__canvas[y, x])
+
+    def setLEDs(self, led=None, rgb=None, brightness=None):
+        """
+        Sets the RGB value, and optionally brightness, of one LED or all LEDs on the canvas.
+
+        :type led: tuple or None
+        :param led: The (x, y) location on the canvas, or None to set all LEDs.
+
+        :type rgb: tuple or None
+        :param rgb: A tuple consisting of 3 elements, (red, green, blue), with each value being between 0 and 255,
+            4 elements, (red, green, blue, white), if any strip is RGBW, or None to only set the brightness.
+
+        :type brightness: int or None
+        :param brightness: A value between 0 (dim) to 255 (very bright) or None to keep the current brightness.
+        """
+        if led is None:
+            target = self.__canvas.reshape(-1, self.__channels)
+        else:
+            x, y = self.__checkLED(led)
+            target = self.__canvas[y, x]
+
+        if rgb is not None:
+            if type(rgb) is not tuple or len(rgb) not in (3, self.__channels - 1):
+                raise ValueError('The rgb value must be a tuple of the form (r, g, b), or (r, g, b, w) for RGBW LEDs.')
+            red, green, blue, white = ([int(c) & 0xff for c in rgb] + [0])[0:4]
+            target[..., 0:3] = (red, green, blue)
+            target[..., 4:] = white
+
+        if brightness is not None:
+            if not 0 <= brightness <= 255:
+                raise ValueError('Brightness must be between 0 and 255')
+            target[..., 3] = brightness
+
+    def clearLEDs(self):
+        """
+        Clears all of the LEDs on the canvas (sets them to black), leaving the brightness as it is.
+        """
+        self.__canvas[:, :, 0:3] = 0
+        self.__canvas[:, :, 4:] = 0
+
+    def copyToStrips(self):
+        """Copies each strip's part of the canvas to the strip, without showing it. Provided by each kind of canvas."""
+        raise NotImplementedError
+
+    def showLEDs(self):
+        """
+        Copies the canvas to the strips (see :class:`copyToStrips()`) and shows all of the strips.
+
+        Only strips with changed LEDs are updated. ``threaded`` strips are all handed their frames before any of them
+        is sent, so their encoding overlaps, and terminals that do not share hardware are sent together.
+        """
+        self.copyToStrips()
+
+        for strip in self.__strips:
+            strip.showLEDs()
+
+    def stopThread(self):
+        """
+        Stops the output threads of any ``threaded`` strips.
+        """
+        for strip in self.__strips:
+            strip.stopThread()
+
+
+class StripGroup(StripCanvas):
+    """
+    Groups several :class:`Strip` objects (normally the four terminals of one PixelPi board) so that they can be
+    drawn on as one canvas and shown with one call.
+
+    The strips are laid side by side, left to right in the order given, so the group is as wide as all of the strips
+    added together and as high as the highest strip. A group of LED strings is one column per string::
+
+        strip1 = Strip(1, 180, ledtype='WS2811_GRB', brightness=50, threaded=True)
+        strip2 = Strip(2, 180, ledtype='WS2811_GRB', brightness=50, threaded=True)
+        strip3 = Strip(3, 180, ledtype='WS2811_GRB', brightness=50, threaded=True)
+        strip4 = Strip(4, 180, ledtype='WS2811_GRB', brightness=50, threaded=True)
+
+        board = StripGroup([strip1, strip2, strip3, strip4])
+        board.setLEDs(rgb=(255, 0, 0))
+        board.showLEDs()
+
+    If the strips are ``threaded``, :class:`showLEDs()` hands each strip its frame and returns straight away, and
+    each strip's output thread encodes and sends its frame while the next frame is drawn. Terminals that share
+    hardware are still sent one after another: terminals 2, 3 and 4 share a DMA channel (and 2 and 4 the PWM
+    peripheral), so only terminal 1, which uses SPI, is sent at the same time as them (see
+    :class:`WS281xBackend`).
+
+    :type strips: list
+    :param strips: The :class:`Strip` objects in the group.
+
+    :type maxcurrent: float or None
+    :param maxcurrent: The most current (in milliamps) the whole board may draw. When a frame would draw more, every
+        strip is dimmed by the same amount (see :class:`Strip.powerScale`). None for no limit.
+    """
+
+    def __init__(self, strips, maxcurrent=None):
+        channels = self.checkStrips(strips)
+
+        if maxcurrent is not None and maxcurrent <= 0:
+            raise ValueError('The maximum current must be more than 0.')
+
+        self.__strips = list(strips)
+        self.__maxcurrent = maxcurrent
+
+        # ------------------------------------------------------------------
+        # Where each strip starts on the group canvas
+        # ------------------------------------------------------------------
+        self.__offsets = []
+        width = 0
+        for strip in self.__strips:
+            self.__offsets.append(width)
+            width += strip.getWidth
+        height = max(strip.getHeight for strip in self.__strips)
+
+        # ------------------------------------------------------------------
+        # The group canvas, indexed by [y, x], starting with what the strips
+        # are already showing. It holds white as well if any strip is RGBW
+        # ------------------------------------------------------------------
+        self.__canvas = np.zeros((height, width, channels), dtype=np.uint8)
+        for strip, x in zip(self.__strips, self.__offsets):
+            leds = strip.getLEDs(export="SNAPSHOT").reshape(strip.getHeight, strip.getWidth, strip.getChannels)
+            self.__canvas[:strip.getHeight, x:x + strip.getWidth, :strip.getChannels] = leds
+
+        super().__init__(strips, self.__canvas)
+
+    @property
+    def maxCurrent(self):
+        """
+        Returns or sets the most current (in milliamps) the whole board may draw, or None for no limit.
+
+        :getter: Returns the limit.
+        :setter: Sets the limit.
+        :type: float or None
+        """
+        return self.__maxcurrent
+
+    @maxCurrent.setter
+    def maxCurrent(self, maxcurrent):
+        """
+        The setter for maxCurrent property.
+        """
+        if maxcurrent is not None and maxcurrent <= 0:
+            raise ValueError('The maximum current must be more than 0.')
+        self.__maxcurrent = maxcurrent
+
+    @property
+    def getCurrent(self):
+        """Returns the estimated current (in milliamps) drawn by the last frame shown on all of the strips."""
+        return sum(strip.getCurrent for strip in self.__strips)
+
+    def __powerScale(self):
+        """
+        Estimates the current the group canvas would draw, from each LED's colour and brightness before colour
+        correction (which can only lower it), and returns how much to dim every strip by to keep within the limit.
+        """
+        idlecurrent = colourcurrent = 0.0
+        for strip, x in zip(self.__strips, self.__offsets):
+            perchannel, idle = strip.ledcurrents[strip.getStripType]
+            region = self.__canvas[:strip.getHeight, x:x + strip.getWidth]
+            levels = region[:, :, 0:3].sum(axis=2, dtype=np.uint32) + region[:, :, 4:].sum(axis=2, dtype=np.uint32)
+            levels *= region[:, :, 3]
+
+            idlecurrent += idle * strip.getLength
+            colourcurrent += int(levels.sum(dtype=np.uint64)) * perchannel / (255.0 * 255.0)
+
+        if colourcurrent == 0 or idlecurrent + colourcurrent <= self.__maxcurrent:
+            return 1.0
+
+        return max(self.__maxcurrent - idlecurrent, 0.0) / colourcurrent
+
+    def copyToStrips(self):
+        """
+        Copies each strip's part of the group canvas to the strip, as a pattern so that only the LEDs that have
+        changed are sent again. If the group has a :class:`maxCurrent`, all of the strips are dimmed together when the
+        frame would draw more.
+        """
+        scale = 1.0 if self.__maxcurrent is None else self.__powerScale()
+
+        for strip, x in zip(self.__strips, self.__offsets):
+            strip.setLEDs(pattern=self.__canvas[:strip.getHeight, x:x + strip.getWidth, :strip.getChannels])
+            strip.powerScale = scale
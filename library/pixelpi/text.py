@@ -0,0 +1,402 @@
+"""
+.. module:: pixelpi
+   :platform: Unix
+   :synopsis: Text, scrolling tickers and sprites drawn onto a matrix of LEDs
+
+Text is drawn from a :class:`Font`, whose characters are turned into masks once and then kept. A :class:`Marquee`
+draws a whole message once into a long strip of colours and scrolls by sliding a window along it, so each frame is
+a single array copy however long the message is::
+
+    ticker = Marquee(strip, "Hello from the PixelPi!", rgb=(255, 128, 0))
+
+    while True:
+        ticker.update()
+        strip.showLEDs()
+        time.sleep(1 / 60)
+
+:func:`drawText` and :func:`blit` draw text and :class:`Sprite` images at a position, leaving the LEDs around and
+behind any transparent parts as they are, and clipping anything that does not fit.
+"""
+
+import string
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+directionlist = ["LEFT", "RIGHT", "UP", "DOWN"]
+
+# ------------------------------------------------------------------
+# The built in 5 x 7 font for the printable ASCII characters from
+# space to ~. Each character is 5 columns, and bit 0 of each column is
+# the top row
+# ------------------------------------------------------------------
+_font5x7 = bytes.fromhex(
+    "0000000000" "00005f0000" "0007000700" "147f147f14" "242a7f2a12" "2313086462" "3649562050" "0005030000"
+    "001c224100" "0041221c00" "14083e0814" "08083e0808" "0050300000" "0808080808" "0060600000" "2010080402"
+    "3e5149453e" "00427f4000" "4261514946" "2141454b31" "1814127f10" "2745454539" "3c4a494930" "0171090503"
+    "3649494936" "064949291e" "0036360000" "0056360000" "0814224100" "1414141414" "0041221408" "0201510906"
+    "3249794130" "7e1111117e" "7f49494936" "3e41414122" "7f4141221c" "7f49494941" "7f09090901" "3e4149497a"
+    "7f0808087f" "00417f4100" "2040413f01" "7f08142241" "7f40404040" "7f020c027f" "7f0408107f" "3e4141413e"
+    "7f09090906" "3e4151215e" "7f09192946" "4649494931" "01017f0101" "3f4040403f" "1f2040201f" "3f4038403f"
+    "6314081463" "0708700807" "6151494543" "007f414100" "0204081020" "0041417f00" "0402010204" "4040404040"
+    "0001020400" "2054545478" "7f48444438" "3844444420" "384444487f" "3854545418" "087e090102" "0c5252523e"
+    "7f08040478" "00447d4000" "2040443d00" "7f10284400" "00417f4000" "7c04180478" "7c08040478" "3844444438"
+    "7c14141408" "081414187c" "7c08040408" "4854545420" "043f444020" "3c4040207c" "1c2040201c" "3c4030403c"
+    "4428102844" "0c5050503c" "4464544c44" "0008364100" "00007f0000" "0041360800" "0804081008"
+)
+
+
+class Font:
+    """
+    A font for drawing text on LEDs. Each character is turned into a mask (0 for background up to 255 for the
+    character) the first time it is used, and kept for next time.
+
+    :type font: PIL.ImageFont.ImageFont or None
+    :param font: A Pillow font (from ``ImageFont.load()`` or ``ImageFont.truetype()``), or None for the built in
+        5 x 7 font.
+
+    :type threshold: int or None
+    :param threshold: For a Pillow font, the mask value (0-255) at or above which a pixel is lit, so the text is
+        sharp on the LEDs. None keeps the smoothed edges.
+    """
+
+    def __init__(self, font=None, threshold=128):
+        self.__font = font
+        self.__threshold = threshold
+        self.__glyphs = {}
+
+        if font is None:
+            self.__height = 7
+        else:
+            self.__height = max(max(font.getbbox(c)[3] for c in string.printable), 1)
+
+    @property
+    def getHeight(self):
+        """Returns the height of the characters."""
+        return self.__height
+
+    def getGlyph(self, char):
+        """
+        Returns the mask of a character as a (height, width) uint8 array.
+
+        :type char: str
+        :param char: The character.
+        """
+        glyph = self.__glyphs.get(char)
+
+        if glyph is None:
+            glyph = self.__drawGlyph(char)
+            glyph.flags.writeable = False
+            self.__glyphs[char] = glyph
+
+        return glyph
+
+    def __drawGlyph(self, char):
+        """Turns a character into a mask."""
+        if self.__font is None:
+            code = ord(char) - 0x20
+            if not 0 <= code < len(_font5x7) // 5:
+                code = ord('?') - 0x20
+
+            columns = np.frombuffer(_font5x7, dtype=np.uint8, count=5, offset=code * 5)
+            return ((columns >> np.arange(7, dtype=np.uint8).reshape(7, 1)) & 1) * np.uint8(255)
+
+        width = max(int(np.ceil(self.__font.getlength(char))), 1)
+        image = Image.new('L', (width, self.__height))
+        ImageDraw.Draw(image).text((0, 0), char, font=self.__font, fill=255)
+        glyph = np.asarray(image)
+
+        if self.__threshold is not None:
+            glyph = np.where(glyph >= self.__threshold, 255, 0).astype(np.uint8)
+
+        return glyph
+
+    def render(self, text, spacing=1, vertical=False):
+        """
+        Returns the mask of a line of text.
+
+        :type text: str
+        :param text: The text.
+
+        :type spacing: int
+        :param spacing: The gap between characters.
+
+        :type vertical: bool
+        :param vertical: Whether the characters run down (one below the other) rather than across.
+
+        :return: A (height, width) uint8 array
+        """
+        glyphs = [self.getGlyph(c) for c in text]
+        if len(glyphs) == 0:
+            return np.zeros((self.__height, 0), dtype=np.uint8)
+
+        if vertical:
+            width = max(glyph.shape[1] for glyph in glyphs)
+            glyphs = [np.pad(glyph, ((0, spacing), (0, width - glyph.shape[1]))) for glyph in glyphs]
+            return np.concatenate(glyphs, axis=0)
+
+        glyphs = [np.pad(glyph, ((0, 0), (0, spacing))) for glyph in glyphs]
+        return np.concatenate(glyphs, axis=1)
+
+
+_defaultfont = None
+
+
+def _font(font):
+    """Returns the font, or the built in font if it is None."""
+    global _defaultfont
+
+    if font is not None:
+        return font
+    if _defaultfont is None:
+        _defaultfont = Font()
+
+    return _defaultfont
+
+
+def _colour(mask, rgb, background=None):
+    """Returns the (height, width, 3) colours of a mask drawn in a colour over a background colour (or black)."""
+    rgb = np.array(rgb, dtype=np.uint16)
+    background = np.zeros(3, dtype=np.uint16) if background is None else np.array(background, dtype=np.uint16)
+    alpha = mask[:, :, np.newaxis].astype(np.uint16)
+
+    return ((rgb * alpha + background * (255 - alpha) + 127) // 255).astype(np.uint8)
+
+
+def _place(canvas, colours, alpha, x, y):
+    """
+    Draws colours onto a canvas with their top left at (x, y), clipped to the canvas, in one array operation.
+    Where ``alpha`` is given it blends them, and where it is None the colours are opaque.
+    """
+    height, width = canvas.shape[0:2]
+    left, top = max(x, 0), max(y, 0)
+    right, bottom = min(x + colours.shape[1], width), min(y + colours.shape[0], height)
+
+    if left >= right or top >= bottom:
+        return
+
+    source = colours[top - y:bottom - y, left - x:right - x]
+    target = canvas[top:bottom, left:right, 0:3]
+
+    if alpha is None:
+        target[:] = source
+        return
+
+    alpha = alpha[top - y:bottom - y, left - x:right - x]
+    if alpha.dtype == bool:
+        np.copyto(target, source, where=alpha[:, :, np.newaxis])
+    else:
+        alpha = alpha[:, :, np.newaxis].astype(np.uint16)
+        target[:] = (source * alpha + target * (255 - alpha) + 127) // 255
+
+
+class Sprite:
+    """
+    A small image to draw onto the LEDs with :func:`blit`.
+
+    :type image: PIL.Image.Image or None
+    :param image: An RGB or RGBA image. The alpha of an RGBA image says how transparent each pixel is.
+
+    :type mask: numpy.ndarray or None
+    :param mask: Instead of an image, a (height, width) mask (0-255, or bool) drawn in the ``rgb`` colour.
+
+    :type rgb: tuple
+    :param rgb: The (red, green, blue) colour of a mask.
+    """
+
+    def __init__(self, image=None, mask=None, rgb=(255, 255, 255)):
+        if image is not None:
+            if image.mode not in ('RGB', 'RGBA'):
+                raise ValueError("The image must be in RGB or RGBA format.")
+
+            colours = np.asarray(image)
+            self.__colours = np.ascontiguousarray(colours[:, :, 0:3])
+            alpha = colours[:, :, 3] if image.mode == 'RGBA' else None
+        elif mask is not None:
+            mask = np.asarray(mask)
+            if mask.ndim != 2:
+                raise ValueError('The mask must be a (height, width) array.')
+            if mask.dtype == bool:
+                mask = mask * np.uint8(255)
+
+            self.__colours = _colour(mask, rgb)
+            alpha = mask
+        else:
+            raise ValueError('A sprite needs either an image or a mask.')
+
+        # ------------------------------------------------------------------
+        # Keep the alpha as a bool mask if every pixel is either fully
+        # transparent or fully opaque, as that is quicker to draw
+        # ------------------------------------------------------------------
+        if alpha is not None and ((alpha == 0) | (alpha == 255)).all():
+            alpha = None if alpha.all() else alpha == 255
+        self.__alpha = alpha
+
+    @property
+    def getWidth(self):
+        """Returns the width of the sprite."""
+        return self.__colours.shape[1]
+
+    @property
+    def getHeight(self):
+        """Returns the height of the sprite."""
+        return self.__colours.shape[0]
+
+    @property
+    def getColours(self):
+        """Returns the (height, width, 3) colours of the sprite."""
+        return self.__colours
+
+    @property
+    def getAlpha(self):
+        """Returns the (height, width) alpha of the sprite, as bool if it has no partly transparent pixels, or None
+        if it is opaque."""
+        return self.__alpha
+
+
+def blit(strip, sprite, position=(0, 0)):
+    """
+    Draws a sprite onto the LEDs, leaving the LEDs behind its transparent pixels as they are.
+
+    :type strip: Strip, StripGroup or Layer
+    :param strip: The LEDs to draw on.
+
+    :type sprite: Sprite
+    :param sprite: The sprite.
+
+    :type position: tuple
+    :param position: The (x, y) location of the top left of the sprite. Parts off the LEDs are clipped.
+    """
+    x, y = position
+    _place(strip.getCanvas, sprite.getColours, sprite.getAlpha, x, y)
+
+
+def drawText(strip, text, position=(0, 0), rgb=(255, 255, 255), font=None, spacing=1):
+    """
+    Draws a line of text onto the LEDs, leaving the LEDs around the characters as they are.
+
+    :type strip: Strip, StripGroup or Layer
+    :param strip: The LEDs to draw on.
+
+    :type text: str
+    :param text: The text.
+
+    :type position: tuple
+    :param position: The (x, y) location of the top left of the text.
+
+    :type rgb: tuple
+    :param rgb: The (red, green, blue) colour of the text.
+
+    :type font: Font or None
+    :param font: The font, or None for the built in 5 x 7 font.
+
+    :type spacing: int
+    :param spacing: The gap between characters.
+    """
+    mask = _font(font).render(text, spacing)
+    if mask.shape[1] > 0:
+        blit(strip, Sprite(mask=mask, rgb=rgb), position)
+
+
+class Marquee:
+    """
+    Scrolls a message across (or up or down) the LEDs.
+
+    The message is drawn once, with a gap after it, into a strip of colours long enough that every view of it is one
+    slice. Each :class:`update()` moves the view along and copies it to the LEDs.
+
+    :type strip: Strip, StripGroup or Layer
+    :param strip: The LEDs to draw on.
+
+    :type text: str
+    :param text: The message.
+
+    :type rgb: tuple
+    :param rgb: The (red, green, blue) colour of the text.
+
+    :type background: tuple or None
+    :param background: The (red, green, blue) colour behind the text, or None to leave the LEDs behind the text as
+        they are (for a ticker over an animation, which must then be drawn again before each update).
+
+    :type direction: str
+    :param direction: The way the text moves: ``LEFT`` *(default)*, ``RIGHT``, ``UP`` or ``DOWN``. Text moving up or
+        down has its characters one below the other.
+
+    :type speed: float
+    :param speed: How many LEDs the text moves each update.
+
+    :type offset: int
+    :param offset: The row the top of the text is on (or the column its left is on when moving up or down).
+
+    :type gap: int or None
+    :param gap: The space after the message before it starts again, or None for the width (or height) of the LEDs,
+        so the message scrolls fully off before it comes back.
+
+    :type font: Font or None
+    :param font: The font, or None for the built in 5 x 7 font.
+
+    :type spacing: int
+    :param spacing: The gap between characters.
+    """
+
+    def __init__(self, strip, text, rgb=(255, 255, 255), background=(0, 0, 0), direction="LEFT", speed=1.0,
+                 offset=0, gap=None, font=None, spacing=1):
+        direction = direction.upper()
+        if direction not in directionlist:
+            raise ValueError('The direction must be one of LEFT, RIGHT, UP or DOWN.')
+        if speed <= 0:
+            raise ValueError('The speed must be more than 0.')
+
+        self.__strip = strip
+        self.__vertical = direction in ("UP", "DOWN")
+        self.__step = speed if direction in ("LEFT", "UP") else -speed
+        self.__offset = offset
+        self.__position = 0.0
+
+        # ------------------------------------------------------------------
+        # Draw the gap and message once, then repeat them so the view is
+        # always a single slice of the tape
+        # ------------------------------------------------------------------
+        mask = _font(font).render(text, spacing, vertical=self.__vertical)
+        if self.__vertical:
+            mask = mask.T
+
+        height, width = strip.getCanvas.shape[0:2]
+        view = height if self.__vertical else width
+        if gap is None:
+            gap = view
+
+        period = gap + mask.shape[1]
+        if period <= 0:
+            raise ValueError('There is nothing to scroll.')
+
+        mask = np.pad(mask, ((0, 0), (gap, 0)))
+        mask = np.tile(mask, (1, -(-(period + view) // period)))[:, 0:period + view]
+
+        if self.__vertical:
+            mask = mask.T
+
+        self.__period = period
+        self.__view = view
+        self.__colours = _colour(mask, rgb, background)
+        self.__alpha = mask >= 128 if background is None else None
+
+    @property
+    def getPosition(self):
+        """Returns how far along the message the view is."""
+        return int(self.__position) % self.__period
+
+    def update(self):
+        """Moves the message along and draws it on the LEDs."""
+        start = int(self.__position) % self.__period
+        end = start + self.__view
+        self.__position = (self.__position + self.__step) % self.__period
+
+        if self.__vertical:
+            colours = self.__colours[start:end]
+            alpha = None if self.__alpha is None else self.__alpha[start:end]
+            _place(self.__strip.getCanvas, colours, alpha, self.__offset, 0)
+        else:
+            colours = self.__colours[:, start:end]
+            alpha = None if self.__alpha is None else self.__alpha[:, start:end]
+            _place(self.__strip.getCanvas, colours, alpha, 0, self.__offset)
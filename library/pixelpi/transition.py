@@ -0,0 +1,314 @@
+"""
+.. module:: pixelpi
+   :platform: Unix
+   :synopsis: Timed, eased transitions between frames of LEDs
+
+A :class:`TransitionQueue` fades the LEDs of a :class:`Strip` (or :class:`StripGroup`, :class:`VirtualCanvas` or
+:class:`Layer`) from one frame to the next over a time, along an easing curve. Transitions are queued and run one
+after another, each starting from where the last ended::
+
+    fader = TransitionQueue(strip)
+    fader.queue(sunrise, duration=5.0, easing="EASEINOUT")
+    fader.queue(daylight, duration=2.0)
+
+    scheduler = FrameScheduler(lambda frame, t: fader.update(), strip, fps=60)
+    scheduler.run(duration=7)
+
+Each easing curve is worked out once as a table. Each frame is then one table lookup and a few array operations on
+buffers kept by the queue, so nothing is allocated as the transition runs.
+"""
+
+import collections
+import math
+import time
+
+import numpy as np
+
+easinglist = ["LINEAR", "EASEIN", "EASEOUT", "EASEINOUT", "SINE"]
+
+_easingcurves = {
+    "LINEAR": lambda t: t,
+    "EASEIN": lambda t: t * t,
+    "EASEOUT": lambda t: 1.0 - (1.0 - t) * (1.0 - t),
+    "EASEINOUT": lambda t: t * t * (3.0 - 2.0 * t),
+    "SINE": lambda t: 0.5 - 0.5 * math.cos(math.pi * t),
+}
+
+_easingtables = {}
+
+
+def easingTable(easing, size=256):
+    """
+    Returns an easing curve as a table of ``size`` weights from the start frame (0) to the end frame (256), worked
+    out once and then kept.
+
+    :type easing: str or function
+    :param easing: One of :data:`easinglist`, or a function taking the time through the transition (0.0-1.0) and
+        returning how far from the start frame (0.0) to the end frame (1.0) the LEDs should be. It may go beyond
+        0.0 and 1.0 to overshoot.
+
+    :type size: int
+    :param size: The number of steps in the table.
+
+    :return: A read only int32 array
+    """
+    key = (easing, size)
+    table = _easingtables.get(key)
+
+    if table is None:
+        if callable(easing):
+            curve = easing
+        elif type(easing) is str and easing.upper() in _easingcurves:
+            curve = _easingcurves[easing.upper()]
+        else:
+            raise ValueError('The easing must be a function or one of {}.'.format(', '.join(easinglist)))
+
+        table = np.array([round(curve(i / (size - 1)) * 256) for i in range(size)], dtype=np.int32)
+        table.flags.writeable = False
+        _easingtables[key] = table
+
+    return table
+
+
+class Transition:
+    """
+    One transition of a :class:`TransitionQueue`. Transitions are made with :class:`TransitionQueue.queue()`.
+    """
+
+    statelist = ["QUEUED", "RUNNING", "FINISHED", "CANCELLED"]
+
+    def __init__(self, end, duration, easing, start):
+        self.__end = end
+        self.__duration = duration
+        self.__table = easingTable(easing)
+        self.__start = start
+        self.__state = "QUEUED"
+
+    @property
+    def getEnd(self):
+        """Returns the frame the transition ends on."""
+        return self.__end
+
+    @property
+    def getStart(self):
+        """Returns the frame the transition starts from, or None to start from the LEDs as they are."""
+        return self.__start
+
+    @property
+    def getDuration(self):
+        """Returns how long the transition takes, in seconds."""
+        return self.__duration
+
+    @property
+    def getTable(self):
+        """Returns the easing table of the transition (see :func:`easingTable`)."""
+        return self.__table
+
+    @property
+    def getState(self):
+        """Returns whether the transition is ``QUEUED``, ``RUNNING``, ``FINISHED`` or ``CANCELLED``."""
+        return self.__state
+
+    def setState(self, state):
+        """Sets the state of the transition. Used by :class:`TransitionQueue`."""
+        if state not in self.statelist:
+            raise ValueError('The state must be one of {}.'.format(', '.join(self.statelist)))
+        self.__state = state
+
+
+class TransitionQueue:
+    """
+    Runs transitions between frames on a set of LEDs, one after another.
+
+    :type strip: Strip, StripGroup, VirtualCanvas or Layer
+    :param strip: The LEDs to run the transitions on.
+
+    :type clock: function
+    :param clock: Returns the current time in seconds (default ``time.monotonic``).
+    """
+
+    def __init__(self, strip, clock=time.monotonic):
+        self.__strip = strip
+        self.__clock = clock
+        self.__shape = strip.getCanvas.shape
+
+        self.__queue = collections.deque()
+        self.__current = None
+        self.__started = 0.0
+        self.__clip = False
+
+        # ------------------------------------------------------------------
+        # The buffers each frame is worked out in, for transitions of the
+        # colours or of every value: the start frame in 8.8 fixed point
+        # (rounded), the end frame less the start frame, and the frame being
+        # worked out. They are made the first time they are needed
+        # ------------------------------------------------------------------
+        self.__buffers = {}
+        self.__base = self.__difference = self.__work = None
+
+    @property
+    def getCurrent(self):
+        """Returns the running :class:`Transition`, or None."""
+        return self.__current
+
+    @property
+    def getQueued(self):
+        """Returns the list of transitions waiting to run."""
+        return list(self.__queue)
+
+    def __checkFrame(self, frame):
+        """
+        Copies a frame into a canvas shaped array.
+
+        :param frame: An object with a canvas (such as a Strip), or an array of the same size as the canvas with
+            either (red, green, blue) or every value of each LED
+        :return: A (height, width, values) uint8 array
+        """
+        if hasattr(frame, "getCanvas"):
+            frame = frame.getCanvas
+
+        frame = np.array(frame, dtype=np.uint8)
+        height, width, channels = self.__shape
+
+        if frame.size not in (height * width * 3, height * width * channels):
+            raise ValueError('The frame must have 3 or {} values for each of the {} LEDs.'.format(channels,
+                                                                                                height * width))
+
+        return frame.reshape(height, width, -1)
+
+    def queue(self, end, duration=1.0, easing="LINEAR", start=None):
+        """
+        Queues a transition, to run once those queued before it have finished.
+
+        :type end: numpy.ndarray or Strip
+        :param end: The frame to end on: an array the size of the canvas with either the (red, green, blue) of each
+            LED, which leaves the brightness as it is, or all of its values, or a Strip (or anything else with a
+            canvas) whose LEDs are copied now.
+
+        :type duration: float
+        :param duration: How long the transition takes, in seconds.
+
+        :type easing: str or function
+        :param easing: The easing curve (see :func:`easingTable`).
+
+        :type start: numpy.ndarray, Strip or None
+        :param start: The frame to start from, with the same values as ``end``, or None to start from the LEDs as
+            they are when the transition starts.
+
+        :return: The :class:`Transition`
+        """
+        if duration < 0:
+            raise ValueError('The duration must be 0 or more.')
+
+        end = self.__checkFrame(end)
+        if start is not None:
+            start = self.__checkFrame(start)
+            if start.shape != end.shape:
+                raise ValueError('The start and end frames must have the same values for each LED.')
+
+        transition = Transition(end, float(duration), easing, start)
+        self.__queue.append(transition)
+
+        return transition
+
+    def cancel(self, transition=None):
+        """
+        Cancels a transition, leaving the LEDs as they are. A queued transition is taken out of the queue, and a
+        running one stops so the next in the queue starts.
+
+        :type transition: Transition or None
+        :param transition: The transition to cancel, or None to cancel the running transition and all of those
+            queued.
+        """
+        if transition is None:
+            cancelled = list(self.__queue)
+            self.__queue.clear()
+            if self.__current is not None:
+                cancelled.append(self.__current)
+            self.__current = None
+        elif transition is self.__current:
+            cancelled = [transition]
+            self.__current = None
+        elif transition in self.__queue:
+            cancelled = [transition]
+            self.__queue.remove(transition)
+        else:
+            return
+
+        for cancel in cancelled:
+            cancel.setState("CANCELLED")
+
+    def __begin(self, transition, canvas, now):
+        """Starts a transition, filling the buffers from its start and end frames."""
+        channels = transition.getEnd.shape[2]
+        if channels not in self.__buffers:
+            shape = self.__shape[0:2] + (channels,)
+            self.__buffers[channels] = tuple(np.zeros(shape, dtype=np.int32) for _ in range(3))
+        self.__base, self.__difference, self.__work = self.__buffers[channels]
+
+        start = canvas[:, :, 0:channels] if transition.getStart is None else transition.getStart
+        self.__base[:] = start
+        self.__difference[:] = transition.getEnd
+        self.__difference -= self.__base
+        self.__base <<= 8
+        self.__base += 128
+
+        # Only an easing curve that overshoots can take the values out of range
+        table = transition.getTable
+        self.__clip = bool(table.min() < 0 or table.max() > 256)
+
+        self.__current = transition
+        self.__started = now
+        transition.setState("RUNNING")
+
+    def update(self, now=None):
+        """
+        Draws the LEDs for the current time (without showing them), moving on to the next queued transition when
+        one finishes.
+
+        :type now: float or None
+        :param now: The time, from the same clock as the queue's ``clock``, or None for the current time.
+
+        :return: Whether the LEDs were changed
+        """
+        if self.__current is None and len(self.__queue) == 0:
+            return False
+
+        if now is None:
+            now = self.__clock()
+
+        canvas = self.__strip.getCanvas
+        begin = now
+
+        while True:
+            if self.__current is None:
+                if len(self.__queue) == 0:
+                    return True
+                self.__begin(self.__queue.popleft(), canvas, begin)
+
+            transition = self.__current
+            elapsed = now - self.__started
+
+            # ------------------------------------------------------------------
+            # A finished transition ends exactly on its end frame, and the next
+            # starts from when it finished, so queued transitions keep to time
+            # ------------------------------------------------------------------
+            if elapsed >= transition.getDuration:
+                canvas[:, :, 0:transition.getEnd.shape[2]] = transition.getEnd
+                transition.setState("FINISHED")
+                self.__current = None
+                begin = self.__started + transition.getDuration
+                continue
+
+            table = transition.getTable
+            weight = table[int(elapsed / transition.getDuration * (len(table) - 1))]
+
+            work = self.__work
+            np.multiply(self.__difference, weight, out=work)
+            work += self.__base
+            work >>= 8
+            if self.__clip:
+                np.clip(work, 0, 255, out=work)
+            np.copyto(canvas[:, :, 0:work.shape[2]], work, casting='unsafe')
+
+            return True
@@ -0,0 +1,263 @@
+"""
+.. module:: pixelpi
+   :platform: Unix
+   :synopsis: Playing animated images and video on a matrix of LEDs
+
+A :class:`VideoPlayer` decodes an animated GIF or PNG (or raw video frames, for example piped from ``ffmpeg``) on a
+worker thread, resizes each frame to the matrix and shows it at the frame rate of the source::
+
+    strip = Strip(4, (32, 8), shape="zmatrix", brightness=30)
+    VideoPlayer(strip, "fire.gif").play(loops=None)
+
+Raw video is read as 24-bit RGB frames of a given size::
+
+    ffmpeg -i clip.mp4 -f rawvideo -pix_fmt rgb24 -s 32x8 - | python3 video.py
+
+    VideoPlayer(strip, sys.stdin.buffer, rawsize=(32, 8), fps=25).play()
+
+The worker thread keeps a few frames ready in a bounded queue. If a frame is not ready, or the LEDs cannot keep up,
+frames whose time has passed are dropped so the video stays in time.
+"""
+
+import queue
+import threading
+import time
+
+import numpy as np
+from PIL import Image, ImageSequence
+
+
+class VideoPlayer:
+    """
+    Plays an animated image or raw video on a :class:`Strip` or :class:`StripGroup` matrix.
+
+    :type strip: Strip or StripGroup
+    :param strip: The LEDs to play the video on.
+
+    :type source: str or file
+    :param source: The file name (or open file) of an animated GIF or PNG, or with ``rawsize`` a binary stream of raw
+        RGB frames.
+
+    :type rawsize: tuple or None
+    :param rawsize: The (width, height) of each raw frame, or None if the source is an image.
+
+    :type fps: float or None
+    :param fps: The frame rate. Raw video defaults to 30; images default to the time given for each frame.
+
+    :type prefetch: int
+    :param prefetch: How many decoded frames the worker thread may have waiting.
+
+    :type resample: int
+    :param resample: The Pillow resampling filter used to resize frames to the matrix.
+
+    :type clock: function
+    :param clock: Returns the current time in seconds (default ``time.monotonic``).
+
+    :type sleep: function
+    :param sleep: Waits for a number of seconds (default ``time.sleep``).
+    """
+
+    statslist = ["framesdecoded", "framesshown", "framesdropped", "decodetime"]
+
+    def __init__(self, strip, source, rawsize=None, fps=None, prefetch=8, resample=Image.BILINEAR,
+                 clock=time.monotonic, sleep=time.sleep):
+        if fps is not None and fps <= 0:
+            raise ValueError('The frame rate must be more than 0.')
+        if prefetch < 1:
+            raise ValueError('The prefetch queue must hold at least 1 frame.')
+        if rawsize is not None and (type(rawsize) is not tuple or len(rawsize) != 2):
+            raise ValueError('The raw frame size must be a tuple of the form (width, height).')
+
+        self.__strip = strip
+        self.__source = source
+        self.__rawsize = rawsize
+        self.__fps = fps
+        self.__size = (strip.getWidth, strip.getHeight)
+        self.__resample = resample
+        self.__clock = clock
+        self.__sleep = sleep
+
+        self.__prefetch = prefetch
+        self.__running = False
+        self.__worker = None
+        self.__error = None
+        self.__stats = dict.fromkeys(self.statslist, 0)
+
+    @property
+    def getStats(self):
+        """
+        Returns a dictionary of how the video has played:
+
+            * ``framesdecoded`` - frames decoded and resized by the worker thread
+            * ``framesshown`` - frames shown on the LEDs
+            * ``framesdropped`` - frames dropped because their time had passed
+            * ``decodetime`` - the total seconds spent decoding and resizing frames
+        """
+        return dict(self.__stats)
+
+    def resetStats(self):
+        """Sets all of the :class:`getStats` counters back to 0."""
+        self.__stats = dict.fromkeys(self.statslist, 0)
+
+    def __imageFrames(self):
+        """Yields each frame of an animated image as an RGB Image, and how long it is shown for."""
+        with Image.open(self.__source) as image:
+            for frame in ImageSequence.Iterator(image):
+                if self.__fps is not None:
+                    duration = 1.0 / self.__fps
+                else:
+                    duration = max(frame.info.get("duration", 100), 10) / 1000.0
+
+                yield frame.convert("RGB"), duration
+
+    def __rawFrames(self):
+        """Yields each raw RGB frame read from the stream as an Image, and how long it is shown for."""
+        width, height = self.__rawsize
+        framesize = width * height * 3
+        duration = 1.0 / (30.0 if self.__fps is None else self.__fps)
+
+        while True:
+            data = self.__source.read(framesize)
+            if data is None or len(data) < framesize:
+                return
+
+            yield Image.frombuffer("RGB", (width, height), data, "raw", "RGB", 0, 1), duration
+
+    def __decode(self, frames, loops):
+        """
+        The worker thread: decodes, resizes and queues the frames, then queues None at the end. If decoding fails,
+        the error is kept for :class:`play()` to raise.
+
+        :param frames: The queue of this play's frames
+        :param loops: How many times to play an animated image, or None until stopped
+        """
+        try:
+            self.__decodeFrames(frames, loops)
+        except Exception as error:
+            self.__error = error
+        finally:
+            self.__put(frames, None)
+
+    def __put(self, frames, item):
+        """Queues an item, waiting for room until the video is stopped. Returns whether it was queued."""
+        while True:
+            try:
+                frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                if not self.__running:
+                    return False
+
+    def __decodeFrames(self, frames, loops):
+        """Decodes, resizes and queues the frames of each loop."""
+        loop = 0
+
+        while self.__running and (loops is None or loop < loops):
+            source = self.__imageFrames() if self.__rawsize is None else self.__rawFrames()
+            decoded = 0
+
+            # Closing the generator closes an image file it has open
+            try:
+                while self.__running:
+                    decodestart = time.perf_counter()
+                    try:
+                        frame, duration = next(source)
+                    except StopIteration:
+                        break
+
+                    if frame.size != self.__size:
+                        frame = frame.resize(self.__size, self.__resample)
+                    colours = np.asarray(frame)
+
+                    self.__stats["decodetime"] += time.perf_counter() - decodestart
+                    self.__stats["framesdecoded"] += 1
+                    decoded += 1
+
+                    if not self.__put(frames, (colours, duration)):
+                        break
+            finally:
+                source.close()
+
+            # A raw stream cannot be played again
+            if self.__rawsize is not None or decoded == 0:
+                break
+            loop += 1
+
+    def play(self, loops=1):
+        """
+        Plays the video, returning when it ends or :class:`stop()` is called (from another thread). If the source
+        cannot be read or decoded, the error from the worker thread is raised here.
+
+        Stopping does not wait for a raw stream that has stalled: the worker thread is left to finish once its read
+        returns.
+
+        :type loops: int or None
+        :param loops: How many times to play an animated image, or None to play it until stopped. Raw video plays
+            until the stream ends.
+        """
+        self.__running = True
+        self.__error = None
+        frames = queue.Queue(maxsize=self.__prefetch)
+        self.__worker = threading.Thread(target=self.__decode, args=(frames, loops), daemon=True)
+        self.__worker.start()
+
+        canvas = self.__strip.getCanvas
+        start = self.__clock()
+        due = 0.0
+
+        try:
+            while self.__running:
+                # ------------------------------------------------------------------
+                # Wait for the next frame a little at a time, so that stop() is
+                # seen even if the source has stalled
+                # ------------------------------------------------------------------
+                try:
+                    item = frames.get(timeout=0.1)
+                except queue.Empty:
+                    if not self.__worker.is_alive() and frames.empty():
+                        break
+                    continue
+
+                if item is None:
+                    break
+
+                colours, duration = item
+                now = self.__clock() - start
+
+                # ------------------------------------------------------------------
+                # Drop a frame whose time has already passed, so the video does
+                # not fall behind
+                # ------------------------------------------------------------------
+                if now >= due + duration:
+                    self.__stats["framesdropped"] += 1
+                    due += duration
+                    continue
+
+                if now < due:
+                    self.__sleep(due - now)
+
+                canvas[:, :, 0:3] = colours
+                self.__strip.showLEDs()
+                self.__stats["framesshown"] += 1
+                due += duration
+        finally:
+            self.__running = False
+
+            # ------------------------------------------------------------------
+            # Give the worker thread a moment to finish, emptying the queue so
+            # it is not left waiting, but not for a stalled stream
+            # ------------------------------------------------------------------
+            deadline = time.monotonic() + 0.5
+            while self.__worker.is_alive() and time.monotonic() < deadline:
+                try:
+                    frames.get_nowait()
+                except queue.Empty:
+                    self.__worker.join(0.05)
+
+        if self.__error is not None:
+            error, self.__error = self.__error, None
+            raise error
+
+    def stop(self):
+        """Stops the video playing, from another thread."""
+        self.__running = False
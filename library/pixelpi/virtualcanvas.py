@@ -0,0 +1,276 @@
+"""
+.. module:: pixelpi
+   :platform: Unix
+   :synopsis: One canvas spread over matrix panels chained on several PixelPi terminals
+"""
+
+import numpy as np
+
+from .strip import Strip
+from .stripgroup import StripCanvas
+
+
+class Panel:
+    """
+    Describes one matrix panel of a :class:`VirtualCanvas`: where its LEDs are on the terminals, how it is wired, and
+    where it sits on the canvas.
+
+    :type terminal: int
+    :param terminal: The terminal (1-4) the panel is chained on.
+
+    :type size: tuple
+    :param size: The (width, height) of the panel as it is wired, before it is rotated.
+
+    :type index: int or None
+    :param index: How many LEDs along the terminal the panel's first LED is, or None for straight after the panel
+        before it on the same terminal (or 0 if it is the first).
+
+    :type offset: tuple
+    :param offset: The (x, y) location on the canvas of the top left of the panel, after it is rotated.
+
+    :type shape: str
+    :param shape: How the panel is wired: :data:`zmatrix` *(default)*, where every other row (or column) runs
+        backwards, or :data:`matrix`, where they all run the same way.
+
+    :type wiring: str
+    :param wiring: ``ROWS`` *(default)* if the LEDs are wired along the rows of the panel, or ``COLUMNS`` if they are
+        wired down its columns, as on many 8 x 32 panels.
+
+    :type rotation: int
+    :param rotation: How far the panel is turned clockwise on the canvas: 0 *(default)*, 90, 180 or 270 degrees.
+
+    :type flip: str or None
+    :param flip: :data:`VERTICAL` to turn the panel upside down, :data:`HORIZONTAL` to mirror it left to right
+        (before it is rotated), or None.
+    """
+
+    wiringlist = ["ROWS", "COLUMNS"]
+
+    rotationlist = [0, 90, 180, 270]
+
+    def __init__(self, terminal, size, index=None, offset=(0, 0), shape="zmatrix", wiring="ROWS", rotation=0,
+                 flip=None):
+        if type(size) is not tuple or len(size) != 2 or size[0] <= 0 or size[1] <= 0:
+            raise ValueError('The panel size must be a tuple of the form (width, height), each 1 or more.')
+        if type(offset) is not tuple or len(offset) != 2 or offset[0] < 0 or offset[1] < 0:
+            raise ValueError('The panel offset must be a tuple of the form (x, y), each 0 or more.')
+        if index is not None and index < 0:
+            raise ValueError('The panel index must be 0 or more.')
+        if shape not in Strip.matrixshapelist:
+            raise ValueError('The panel shape must be either zmatrix or matrix.')
+
+        wiring = wiring.upper()
+        if wiring not in self.wiringlist:
+            raise ValueError('The panel wiring must be either ROWS or COLUMNS.')
+        if rotation not in self.rotationlist:
+            raise ValueError('The panel rotation must be one of 0, 90, 180 or 270.')
+        if flip is not None:
+            flip = flip.upper()
+            if flip not in Strip.mirrorlist:
+                raise ValueError('The panel flip must be either VERTICAL, HORIZONTAL or None.')
+
+        self.__terminal = terminal
+        self.__size = size
+        self.__index = index
+        self.__offset = offset
+        self.__shape = shape
+        self.__wiring = wiring
+        self.__rotation = rotation
+        self.__flip = flip
+
+    @property
+    def getTerminal(self):
+        """Returns the terminal the panel is chained on."""
+        return self.__terminal
+
+    @property
+    def getIndex(self):
+        """Returns how many LEDs along the terminal the panel starts, or None if it follows the panel before it."""
+        return self.__index
+
+    @property
+    def getLength(self):
+        """Returns how many LEDs are in the panel."""
+        return self.__size[0] * self.__size[1]
+
+    @property
+    def getOffset(self):
+        """Returns the (x, y) location on the canvas of the top left of the panel."""
+        return self.__offset
+
+    def getMap(self):
+        """
+        Returns which LED of the panel, counted along its wiring, is at each place it covers on the canvas.
+
+        :return: A (height, width) array, as the panel sits on the canvas after it is flipped and rotated
+        """
+        width, height = self.__size
+
+        if self.__wiring == "ROWS":
+            panel = np.arange(width * height).reshape(height, width)
+            if self.__shape == "zmatrix":
+                panel[1::2] = panel[1::2, ::-1].copy()
+        else:
+            panel = np.arange(width * height).reshape(width, height).T.copy()
+            if self.__shape == "zmatrix":
+                panel[:, 1::2] = panel[::-1, 1::2].copy()
+
+        if self.__flip == "VERTICAL":
+            panel = panel[::-1]
+        elif self.__flip == "HORIZONTAL":
+            panel = panel[:, ::-1]
+
+        return np.rot90(panel, k=-self.__rotation // 90)
+
+
+class VirtualCanvas(StripCanvas):
+    """
+    Draws on matrix panels chained on one or more terminals as one large canvas.
+
+    Each terminal is a :class:`Strip` LED string as long as the panels chained on it, and each panel is described by a
+    :class:`Panel`. For example, a 64 x 16 wall of four 32 x 8 panels wired down their columns, two on each of
+    terminals 1 and 2::
+
+        strip1 = Strip(1, 512, threaded=True)
+        strip2 = Strip(2, 512, threaded=True)
+
+        wall = VirtualCanvas([strip1, strip2], [
+            Panel(1, (32, 8), offset=(0, 0), wiring="COLUMNS"),
+            Panel(1, (32, 8), offset=(32, 0), wiring="COLUMNS"),
+            Panel(2, (32, 8), offset=(0, 8), wiring="COLUMNS"),
+            Panel(2, (32, 8), offset=(32, 8), wiring="COLUMNS", rotation=180)])
+
+    The panels are worked out once into a single table of where every LED on every terminal is on the canvas, so
+    :class:`showLEDs()` moves the whole canvas to the strips in one array operation. LEDs on the strips that are not
+    in any panel are kept off.
+
+    :type strips: list
+    :param strips: The :class:`Strip` LED strings, each on a different terminal.
+
+    :type panels: list
+    :param panels: The :class:`Panel` objects, in the order they are chained on each terminal.
+
+    :type size: tuple or None
+    :param size: The (width, height) of the canvas, or None for just large enough to hold all of the panels.
+    """
+
+    def __init__(self, strips, panels, size=None):
+        self.__channels = self.checkStrips(strips)
+        if len(panels) == 0:
+            raise ValueError('The canvas must have at least one panel.')
+        if any(strip.getWidth != 1 for strip in strips):
+            raise ValueError('The strips must be LED strings; the panels give the shape of the matrix.')
+
+        terminals = [strip.getStripNumber for strip in strips]
+        self.__strips = list(strips)
+        self.__panels = list(panels)
+
+        # ------------------------------------------------------------------
+        # Where each strip's LEDs start in the table of all of the LEDs
+        # ------------------------------------------------------------------
+        self.__starts = {}
+        total = 0
+        for strip in self.__strips:
+            self.__starts[strip.getStripNumber] = total
+            total += strip.getLength
+
+        layouts = [panel.getMap() for panel in self.__panels]
+        if size is None:
+            size = (max(panel.getOffset[0] + layout.shape[1] for panel, layout in zip(self.__panels, layouts)),
+                    max(panel.getOffset[1] + layout.shape[0] for panel, layout in zip(self.__panels, layouts)))
+        if type(size) is not tuple or len(size) != 2:
+            raise ValueError('The canvas size must be a tuple of the form (width, height).')
+        self.__width, self.__height = size
+
+        # ------------------------------------------------------------------
+        # The canvas, with one more black LED after it for the LEDs on the
+        # strips that are not in any panel
+        # ------------------------------------------------------------------
+        blank = self.__width * self.__height
+        self.__flat = np.zeros((blank + 1, self.__channels), dtype=np.uint8)
+        self.__canvas = self.__flat[0:blank].reshape(self.__height, self.__width, self.__channels)
+
+        # ------------------------------------------------------------------
+        # The gather table: the canvas index of every LED on every strip
+        # ------------------------------------------------------------------
+        self.__gather = np.full(total, blank, dtype=np.intp)
+        covered = np.zeros((self.__height, self.__width), dtype=bool)
+        nextindex = {}
+
+        for panel, layout in zip(self.__panels, layouts):
+            terminal = panel.getTerminal
+            if terminal not in self.__starts:
+                raise ValueError('There is no strip on terminal {} for a panel.'.format(terminal))
+
+            index = nextindex.get(terminal, 0) if panel.getIndex is None else panel.getIndex
+            strip = self.__strips[terminals.index(terminal)]
+            if index + panel.getLength > strip.getLength:
+                raise ValueError('A panel on terminal {} goes past the end of the strip.'.format(terminal))
+            nextindex[terminal] = index + panel.getLength
+
+            x, y = panel.getOffset
+            height, width = layout.shape
+            if x + width > self.__width or y + height > self.__height:
+                raise ValueError('A panel on terminal {} is outside the canvas.'.format(terminal))
+            if covered[y:y + height, x:x + width].any():
+                raise ValueError('A panel on terminal {} overlaps another panel.'.format(terminal))
+            covered[y:y + height, x:x + width] = True
+
+            leds = self.__starts[terminal] + index + layout.ravel()
+            if (self.__gather[leds] != blank).any():
+                raise ValueError('A panel on terminal {} uses the same LEDs as another panel.'.format(terminal))
+
+            rows, columns = np.mgrid[y:y + height, x:x + width]
+            self.__gather[leds] = (rows * self.__width + columns).ravel()
+
+        # ------------------------------------------------------------------
+        # Start with what the strips are already showing, and the array the
+        # canvas is gathered into when shown
+        # ------------------------------------------------------------------
+        self.__frame = np.zeros((total, self.__channels), dtype=np.uint8)
+        for strip in self.__strips:
+            start = self.__starts[strip.getStripNumber]
+            self.__frame[start:start + strip.getLength, :strip.getChannels] = strip.getLEDs(export="SNAPSHOT")
+
+        mapped = self.__gather != blank
+        self.__flat[self.__gather[mapped]] = self.__frame[mapped]
+        self.__flat[blank, 3] = 255
+
+        super().__init__(strips, self.__canvas)
+
+    @property
+    def getPanels(self):
+        """Returns the list of panels."""
+        return list(self.__panels)
+
+    def getLocation(self, terminal, index):
+        """
+        Returns where an LED on a terminal is on the canvas.
+
+        :type terminal: int
+        :param terminal: The terminal (1-4).
+
+        :type index: int
+        :param index: How many LEDs along the terminal the LED is.
+
+        :return: The (x, y) location, or None if the LED is not in a panel
+        """
+        if terminal not in self.__starts:
+            raise ValueError('There is no strip on terminal {}.'.format(terminal))
+
+        position = int(self.__gather[self.__starts[terminal] + index])
+        if position == self.__width * self.__height:
+            return None
+
+        return position % self.__width, position // self.__width
+
+    def copyToStrips(self):
+        """
+        Gathers the canvas into the order the LEDs are wired on each terminal, in one array operation, and copies it
+        to the strips as patterns, so that only the LEDs that have changed are sent again.
+        """
+        np.take(self.__flat, self.__gather, axis=0, out=self.__frame)
+
+        for strip in self.__strips:
+            start = self.__starts[strip.getStripNumber]
+            strip.setLEDs(pattern=self.__frame[start:start + strip.getLength, :strip.getChannels])
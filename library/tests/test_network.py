@@ -0,0 +1,243 @@
+"""
+Loopback tests for :class:`pixelpi.NetworkReceiver`: E1.31 and Art-Net packets are sent over 127.0.0.1 to a receiver
+showing them on simulated strips.
+"""
+
+import asyncio
+import socket
+import struct
+
+import pixelpi.network
+from pixelpi import NetworkReceiver, SimulatorBackend, Strip
+
+
+# ------------------------------------------------------------------
+# Packets
+# ------------------------------------------------------------------
+def e131Data(universe, sequence, slots, syncaddress=0):
+    """Returns an E1.31 data packet carrying the DMX slots of a universe."""
+    packet = bytearray(126 + len(slots))
+    packet[0:16] = b"\x00\x10\x00\x00ASC-E1.17\x00\x00\x00"
+    struct.pack_into(">I", packet, 18, 0x00000004)
+    struct.pack_into(">I", packet, 40, 0x00000002)
+    packet[108] = 100
+    struct.pack_into(">HBBH", packet, 109, syncaddress, sequence & 0xff, 0, universe)
+    struct.pack_into(">H", packet, 123, len(slots) + 1)
+    packet[126:] = bytes(slots)
+    return bytes(packet)
+
+
+def e131Sync(sequence, syncaddress):
+    """Returns an E1.31 synchronisation packet."""
+    packet = bytearray(49)
+    packet[0:16] = b"\x00\x10\x00\x00ASC-E1.17\x00\x00\x00"
+    struct.pack_into(">I", packet, 18, 0x00000008)
+    struct.pack_into(">I", packet, 40, 0x00000001)
+    struct.pack_into(">BH", packet, 44, sequence & 0xff, syncaddress)
+    return bytes(packet)
+
+
+def artDmx(universe, sequence, slots):
+    """Returns an ArtDmx packet carrying the DMX slots of a universe."""
+    header = b"Art-Net\x00" + struct.pack("<H", 0x5000) + struct.pack(">HBBBBH", 14, sequence & 0xff, 0,
+                                                                         universe & 0xff, universe >> 8, len(slots))
+    return header + bytes(slots)
+
+
+def artSync():
+    """Returns an ArtSync packet."""
+    return b"Art-Net\x00" + struct.pack("<H", 0x5200) + struct.pack(">HBB", 14, 0, 0)
+
+
+# ------------------------------------------------------------------
+# Loopback
+# ------------------------------------------------------------------
+def freePort():
+    """Returns a UDP port on 127.0.0.1 that nothing is listening on."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def loopback(receiver, steps):
+    """
+    Starts the receiver on 127.0.0.1 and works through the steps, each a packet to send (after which the receiver is
+    given time to handle it), a number of seconds to wait, or a function to call.
+    """
+    async def run():
+        port = freePort()
+        await receiver.start("127.0.0.1", port, multicast=False)
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            for step in steps:
+                if isinstance(step, bytes):
+                    sock.sendto(step, ("127.0.0.1", port))
+                    await asyncio.sleep(0.02)
+                elif isinstance(step, float):
+                    await asyncio.sleep(step)
+                else:
+                    step()
+        receiver.stop()
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+
+
+def makeStrip(length):
+    """Returns a strip on the simulator backend."""
+    return Strip(1, length, backend=SimulatorBackend())
+
+
+def colour(value, leds):
+    """Returns the RGB slots of LEDs all of one colour."""
+    return list(value) * leds
+
+
+# ------------------------------------------------------------------
+# Tests
+# ------------------------------------------------------------------
+def testE131FrameShownWhenEveryUniverseArrives():
+    strip = makeStrip(200)
+    receiver = NetworkReceiver("E131")
+    assert receiver.addTarget(strip, universe=1) == [1, 2]
+
+    frames = []
+    loopback(receiver, [e131Data(1, 0, colour((10, 20, 30), 170)),
+                        lambda: frames.append(receiver.getStats["frames"]),
+                        e131Data(2, 0, colour((40, 50, 60), 30))])
+
+    assert frames == [0]
+    assert receiver.getStats["frames"] == 1
+    assert strip.getLEDs(0)[0:3] == (10, 20, 30)
+    assert strip.getLEDs(169)[0:3] == (10, 20, 30)
+    assert strip.getLEDs(199)[0:3] == (40, 50, 60)
+
+
+def testE131IncompleteFrameShownAfterTimeout():
+    strip = makeStrip(200)
+    receiver = NetworkReceiver("E131", timeout=0.05)
+    receiver.addTarget(strip, universe=1)
+
+    frames = []
+    loopback(receiver, [e131Data(1, 0, colour((1, 2, 3), 170)),
+                        lambda: frames.append(receiver.getStats["frames"]),
+                        0.1])
+
+    assert frames == [0]
+    assert receiver.getStats["frames"] == 1
+    assert receiver.getStats["incompleteframes"] == 1
+    assert strip.getLEDs(0)[0:3] == (1, 2, 3)
+
+
+def testE131FrameWaitsForSync():
+    strip = makeStrip(10)
+    receiver = NetworkReceiver("E131")
+    receiver.addTarget(strip, universe=1)
+
+    frames = []
+    loopback(receiver, [e131Sync(0, 7000),
+                        e131Data(1, 0, colour((5, 6, 7), 10), syncaddress=7000),
+                        lambda: frames.append(receiver.getStats["frames"]),
+                        e131Sync(1, 7000)])
+
+    assert frames == [0]
+    assert receiver.getStats["frames"] == 1
+    assert receiver.getStats["syncpackets"] == 2
+    assert strip.getLEDs(9)[0:3] == (5, 6, 7)
+
+
+def testE131FramesShownWhenSyncStops(monkeypatch):
+    monkeypatch.setattr(pixelpi.network, "_synctimeout", 0.1)
+    strip = makeStrip(10)
+    receiver = NetworkReceiver("E131")
+    receiver.addTarget(strip, universe=1)
+
+    frames = []
+    loopback(receiver, [e131Sync(0, 7000),
+                        e131Data(1, 0, colour((1, 1, 1), 10), syncaddress=7000),
+                        lambda: frames.append(receiver.getStats["frames"]),
+                        e131Data(1, 1, colour((2, 2, 2), 10), syncaddress=7000),
+                        lambda: frames.append(receiver.getStats["frames"]),
+                        0.15,
+                        lambda: frames.append(receiver.getStats["frames"]),
+                        e131Data(1, 2, colour((3, 3, 3), 10), syncaddress=7000)])
+
+    # The sync packets stopped for longer than the timeout, so the frame left waiting was shown then, and the next
+    # frame as it arrived
+    assert frames == [0, 0, 1]
+    assert receiver.getStats["frames"] == 2
+    assert strip.getLEDs(0)[0:3] == (3, 3, 3)
+
+
+def testE131SyncOnlyShowsItsOwnAddress():
+    strip1 = makeStrip(10)
+    strip2 = Strip(2, 10, backend=SimulatorBackend())
+    receiver = NetworkReceiver("E131")
+    receiver.addTarget(strip1, universe=1)
+    receiver.addTarget(strip2, universe=2)
+
+    shown = []
+    loopback(receiver, [e131Sync(0, 7000),
+                        e131Sync(0, 7001),
+                        e131Data(1, 0, colour((1, 1, 1), 10), syncaddress=7000),
+                        e131Data(2, 0, colour((2, 2, 2), 10), syncaddress=7001),
+                        e131Sync(1, 7000),
+                        lambda: shown.append((strip1.getStats["framesshown"], strip2.getStats["framesshown"])),
+                        e131Sync(1, 7001),
+                        lambda: shown.append((strip1.getStats["framesshown"], strip2.getStats["framesshown"]))])
+
+    assert shown == [(1, 0), (1, 1)]
+
+
+def testE131OutOfOrderPacketsDropped():
+    strip = makeStrip(10)
+    receiver = NetworkReceiver("E131")
+    receiver.addTarget(strip, universe=1)
+
+    loopback(receiver, [e131Data(1, 5, colour((9, 9, 9), 10)),
+                        e131Data(1, 4, colour((8, 8, 8), 10)),
+                        e131Data(1, 7, colour((7, 7, 7), 10))])
+
+    stats = receiver.getStats
+    assert stats["frames"] == 2
+    assert stats["outoforder"] == 1
+    assert stats["lostpackets"] == 1
+    assert strip.getLEDs(0)[0:3] == (7, 7, 7)
+
+
+def testArtNetFrameShown():
+    strip = makeStrip(10)
+    receiver = NetworkReceiver("ARTNET")
+    receiver.addTarget(strip, universe=0)
+
+    loopback(receiver, [artDmx(0, 1, colour((11, 12, 13), 10)), artDmx(3, 1, colour((1, 1, 1), 10))])
+
+    stats = receiver.getStats
+    assert stats["frames"] == 1
+    assert stats["ignoredpackets"] == 1
+    assert strip.getLEDs(0)[0:3] == (11, 12, 13)
+
+
+def testArtNetFrameWaitsForSync():
+    strip = makeStrip(10)
+    receiver = NetworkReceiver("ARTNET")
+    receiver.addTarget(strip, universe=0)
+
+    frames = []
+    loopback(receiver, [artSync(),
+                        artDmx(0, 1, colour((21, 22, 23), 10)),
+                        lambda: frames.append(receiver.getStats["frames"]),
+                        artSync()])
+
+    assert frames == [0]
+    assert receiver.getStats["frames"] == 1
+    assert strip.getLEDs(0)[0:3] == (21, 22, 23)
+
+
+def testBadPacketsCounted():
+    receiver = NetworkReceiver("E131")
+    receiver.addTarget(makeStrip(10), universe=1)
+
+    loopback(receiver, [b"not a packet", artDmx(1, 0, colour((1, 1, 1), 10))])
+
+    assert receiver.getStats["badpackets"] == 2
+    assert receiver.getStats["frames"] == 0
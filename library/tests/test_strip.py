@@ -0,0 +1,87 @@
+"""
+Tests for :class:`pixelpi.Strip` on the simulator backend.
+"""
+
+from pixelpi import SimulatorBackend, Strip
+
+
+def makeStrip(length, **kwargs):
+    """Returns a strip on the simulator backend, recording the frames it shows."""
+    return Strip(1, length, backend=SimulatorBackend(record=True), **kwargs)
+
+
+def testHeldLEDsStayInOrderAfterShift():
+    strip = makeStrip(8)
+    leds = strip.getLEDs()
+    leds[0] = (255, 0, 0, 255)
+    strip.showLEDs()
+
+    strip.shift("UP", 1)
+    leds[0] = (0, 0, 255, 255)
+    strip.showLEDs()
+
+    assert strip.getLEDs(0) == (0, 0, 255, 255)
+    assert strip.getLEDs(1) == (255, 0, 0, 255)
+
+
+def testHeldCanvasStaysInOrderAfterShift():
+    strip = makeStrip(8)
+    canvas = strip.getCanvas
+    canvas[0, 0] = (255, 0, 0, 255)
+
+    strip.shift("UP", 1)
+    canvas[0, 0] = (0, 0, 255, 255)
+    strip.showLEDs()
+
+    assert strip.getLEDs(0) == (0, 0, 255, 255)
+    assert strip.getLEDs(1) == (255, 0, 0, 255)
+
+
+def testShiftAfterReleaseLEDs():
+    strip = makeStrip(8)
+    strip.getLEDs()[2] = (0, 255, 0, 255)
+    strip.releaseLEDs()
+
+    strip.shift("UP", 3)
+    strip.showLEDs()
+
+    assert strip.getLEDs(5) == (0, 255, 0, 255)
+    assert strip.getLEDs(2) == (0, 0, 0, 255)
+    assert strip.getLEDs()[5].tolist() == [0, 255, 0, 255]
+
+
+def testReleaseLEDsKeepsChangesMadeThroughTheArray():
+    strip = makeStrip(8)
+    strip.showLEDs()
+    strip.resetStats()
+
+    strip.getLEDs()[4] = (1, 2, 3, 255)
+    strip.releaseLEDs()
+    strip.showLEDs()
+
+    assert strip.getStats["pixelsencoded"] == 1
+    assert strip.getLEDs(4) == (1, 2, 3, 255)
+
+
+def testCloseStopsTheOutputThreadFirst():
+    class Backend(SimulatorBackend):
+        closed = False
+        showsafterclose = 0
+
+        def show(self):
+            if self.closed:
+                self.showsafterclose += 1
+            super().show()
+
+        def close(self):
+            self.closed = True
+
+    backend = Backend()
+    strip = Strip(1, 8, backend=backend, threaded=True)
+    strip.setLEDs(rgb=(1, 2, 3))
+    strip.showLEDs()
+    strip.close()
+
+    assert backend.closed
+    assert backend.showsafterclose == 0
+    assert len(backend.getFrames) == 1
@@ -0,0 +1,21 @@
+"""
+Tests for :class:`pixelpi.StripGroup` on the simulator backend.
+"""
+
+from pixelpi import SimulatorBackend, Strip, StripGroup
+
+
+def testOnlyChangedLEDsAreSent():
+    strips = [Strip(terminal, 16, backend=SimulatorBackend()) for terminal in (1, 2)]
+    group = StripGroup(strips)
+    group.showLEDs()
+    group.resetStats()
+
+    group.setLEDs((1, 5), rgb=(255, 0, 0))
+    group.showLEDs()
+
+    assert group.getStats["pixelsencoded"] == 1
+    assert strips[1].getLEDs(5) == (255, 0, 0, 255)
+
+    group.showLEDs()
+    assert group.getStats["framesskipped"] == 3